@@ -31,11 +31,13 @@ data_source = os.environ.get("DATA_SOURCE", "Online (Production)")
 
 st.sidebar.title("Dashboard Info")
 
-# --- ADDED: Refresh Button ---
-if st.sidebar.button("🔄 Clear Cache & Refresh Data"):
-    st.cache_data.clear()
-    st.cache_resource.clear()
+# --- Refresh Button ---
+# Only reloads tables that changed since they were loaded, and is rate limited, so it's safe to spam.
+if st.sidebar.button("🔄 Refresh Data"):
+    st.session_state.refresh_message = Streamlit_utils.refresh_data()
     st.rerun()
+if 'refresh_message' in st.session_state:
+    st.sidebar.info(st.session_state.pop('refresh_message'))
 
 
 # This runs only once per session to get the timezone.
@@ -85,8 +87,49 @@ else:
     else:
         st.sidebar.warning("Data Source: Local DB\n\nCould not read last updated time from `run_metadata` table.", icon="⚠️")
 
+# Shown while the circuit breaker is holding back requests to a failing Supabase backend
+backend_status = Streamlit_utils.get_backend_status()
+if data_source == 'Online (Production)' and backend_status['state'] != 'closed':
+    st.sidebar.error(f"**Database unreachable.** Showing saved data. Retrying in {backend_status['retry_in_seconds']:.0f}s.", icon="🔌")
+
 st.sidebar.markdown("---")
 
+# --- Shared table store memory usage ---
+# Store internals are only for whoever runs the dashboard, so they are hidden unless SHOW_CACHE_STATS=1.
+# The deployed dashboard reads the local database too, so the data source alone can't tell.
+if os.environ.get("SHOW_CACHE_STATS") == "1":
+    with st.sidebar.expander("📊 Cache Memory Usage"):
+        warmup_status = Streamlit_utils.get_warmup_status()
+        if Streamlit_utils.is_warmup_complete():
+            st.caption(f"✅ Warmup finished in {warmup_status['duration_seconds']:.1f}s ({warmup_status['tables_loaded']} tables, {warmup_status['tables_failed']} failed).")
+        else:
+            st.caption("⏳ Warming up tables and assets in the background...")
+        cache_counters = Streamlit_utils.get_table_cache_counters()
+        lookups = cache_counters['hits'] + cache_counters['misses']
+        st.caption(
+            f"Budget: {cache_counters['used_mb']:.1f} / {cache_counters['budget_mb']:.0f} MB · "
+            f"Hit rate: {cache_counters['hits'] / lookups if lookups else 0:.0%} "
+            f"({cache_counters['hits']} hits, {cache_counters['stale_hits']} served stale while refreshing, {cache_counters['misses']} misses, {cache_counters['coalesced']} coalesced) · "
+            f"Evictions: {cache_counters['evictions']}"
+        )
+        df_cache_stats = Streamlit_utils.get_table_memory_stats()
+        if df_cache_stats.empty:
+            st.caption("No tables have been loaded yet.")
+        else:
+            st.metric(label="Cached Tables", value=len(df_cache_stats))
+            memory_saved_mb = df_cache_stats['Raw_Memory_MB'].sum() - df_cache_stats['Memory_MB'].sum()
+            st.metric(label="Memory Used", value=f"{df_cache_stats['Memory_MB'].sum():.1f} MB", delta=f"{memory_saved_mb:.1f} MB saved by compact dtypes", delta_color="off")
+            st.dataframe(
+                df_cache_stats,
+                column_config={
+                    "Memory_MB": st.column_config.NumberColumn("Memory (MB)", format="%.2f"),
+                    "Raw_Memory_MB": st.column_config.NumberColumn("Before Compaction (MB)", format="%.2f")
+                },
+                column_order=("Table", "Query", "Rows", "Raw_Memory_MB", "Memory_MB"),
+                use_container_width=True,
+                hide_index=True
+            )
+
 
 st.info("**🚧This is a preview**: This project is a work in progress and some data may be incorrect.🚧")
 
@@ -97,7 +140,6 @@ with st.expander("📝 View Preview To-Do List & Known Issues"):
     - Replace AI placeholder text on all pages
     - Re-order and correct titles on pages
     - Correctly set the clan clog previous data and group correctly
-    - Add slider to each page for number of MVPs to display
     - Fix `last 14 day` tables not loading
     - Fix Valuable Drops page incorrectly summing drops      
     - Offical launch!
@@ -2,62 +2,219 @@
 # Utility functions for the Streamlit dashboard.
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import httpx
 from st_supabase_connection import SupabaseConnection
+from postgrest.exceptions import APIError
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, select, table, column
+from sqlalchemy.engine import Engine
+from contextlib import contextmanager
 from pathlib import Path
+from urllib.parse import quote
 try:
     import tomllib
 except ImportError:
     import tomli as tomllib
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+import toml
+import yaml
+import json
+import base64
+import logging
 import os
+import re
+import tempfile
+import threading
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from itertools import chain, count
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# --- Functions to track local database file changes ---
+
+# Seconds the database file must stay unchanged before a change is published,
+# so a burst of events from a single ETL write only bumps the version once.
+DB_WATCH_DEBOUNCE_SECONDS = float(os.environ.get("DB_WATCH_DEBOUNCE_SECONDS", 2))
+# Safety net for filesystems that do not deliver change events (e.g. some Docker Desktop mounts).
+DB_WATCH_FALLBACK_POLL_SECONDS = float(os.environ.get("DB_WATCH_FALLBACK_POLL_SECONDS", 60))
+
+def _stat_local_db(local_db_path: Path):
+    """
+    Returns the inode, modification time and size of the database file, or None if it is missing.
+    The inode changes whenever the ETL atomically swaps in a new file.
+    """
+    try:
+        stat_result = local_db_path.stat()
+        return (stat_result.st_ino, stat_result.st_mtime, stat_result.st_size)
+    except OSError:
+        # The file can be briefly unavailable while the ETL replaces it.
+        return None
+
+class _DbFileWatcher(FileSystemEventHandler):
+    """
+    Watches the directory holding the local database and publishes a new version
+    once the ETL has finished replacing the database file.
+    Events are debounced: the file must be quiet for DB_WATCH_DEBOUNCE_SECONDS and its
+    identity must have actually changed before the version counter is bumped.
+    """
+
+    def __init__(self, local_db_path: Path):
+        super().__init__()
+        self.local_db_path = local_db_path
+        self.version = 0
+        self.state = _stat_local_db(local_db_path)
+        self._lock = threading.Lock()
+        self._debounce_timer = None
+        self._last_checked = time.monotonic()
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(self, str(local_db_path.parent), recursive=False)
+        self._observer.start()
+
+    def on_any_event(self, event):
+        # The ETL writes a temporary file and moves it over the database, so the
+        # database path can show up as either the source or the destination.
+        event_paths = {event.src_path, getattr(event, 'dest_path', '')}
+        if any(path and Path(os.fsdecode(path)).name == self.local_db_path.name for path in event_paths):
+            self._schedule_publish()
+
+    def _schedule_publish(self):
+        with self._lock:
+            if self._debounce_timer is not None:
+                self._debounce_timer.cancel()
+            self._debounce_timer = threading.Timer(DB_WATCH_DEBOUNCE_SECONDS, self._publish)
+            self._debounce_timer.daemon = True
+            self._debounce_timer.start()
+
+    def _publish(self):
+        """Bumps the version if the database file's identity has changed."""
+        state = _stat_local_db(self.local_db_path)
+        with self._lock:
+            self._last_checked = time.monotonic()
+            if state is not None and state != self.state:
+                self.state = state
+                self.version += 1
+
+    def check_if_due(self):
+        """Re-stats the file if no change has been checked for DB_WATCH_FALLBACK_POLL_SECONDS."""
+        if time.monotonic() - self._last_checked > DB_WATCH_FALLBACK_POLL_SECONDS:
+            self._publish()
+
+_db_watcher = None
+_db_watcher_started = False
+_db_watcher_lock = threading.Lock()
+
+def _get_db_watcher():
+    """
+    Returns the process-wide database file watcher, starting it on first use.
+    Returns None if watchdog is unavailable or the watcher could not be started,
+    in which case the database file is polled instead.
+    """
+    global _db_watcher, _db_watcher_started
+    if _db_watcher_started:
+        return _db_watcher
+    with _db_watcher_lock:
+        if not _db_watcher_started:
+            local_db_path_str = os.environ.get("LOCAL_DB_PATH")
+            if Observer is not None and local_db_path_str:
+                try:
+                    _db_watcher = _DbFileWatcher(Path(local_db_path_str).resolve())
+                except Exception as e:
+                    logger.warning("Could not watch the local database for changes, falling back to polling: %s", e)
+            _db_watcher_started = True
+    return _db_watcher
 
-# --- Function to track local database file changes ---
 @st.cache_data(ttl=10)
+def _poll_local_db_state():
+    """Stats the local database file. Used when the file watcher is unavailable."""
+    local_db_path_str = os.environ.get("LOCAL_DB_PATH")
+    return _stat_local_db(Path(local_db_path_str)) if local_db_path_str else None
+
 def get_local_db_state():
     """
-    Gets the modification time and size of the local database file.
-    This acts as a cache key. When the file is replaced by the ETL,
-    this function's output will change. This change is detected by Streamlit,
-    triggering a cache invalidation for any data-loading functions that call this.
-    This ensures that the Streamlit app always displays the latest data after an ETL run.
+    Gets the identity (inode, modification time and size) of the local database file.
+    This acts as a cache key. When the file is replaced by the ETL, the background
+    file watcher picks up the change and this function's output changes, so any
+    cache keyed on it reloads the latest data straight after an ETL run.
+    Reading the state is free: the file is only re-stat'ed when the watcher sees it change.
     """
     data_source = os.environ.get("DATA_SOURCE", "Online (Production)")
     if data_source == 'Local (Development)':
-        try:
-            local_db_path_str = os.environ.get("LOCAL_DB_PATH")
-            if local_db_path_str:
-                local_db_path = Path(local_db_path_str)
-                if local_db_path.exists():
-                    # Return a tuple of modification time and size to be robust.
-                    # This unique signature represents the file's current state.
-                    return (local_db_path.stat().st_mtime, local_db_path.stat().st_size)
-        except (FileNotFoundError, Exception):
-            # If file is temporarily unavailable during ETL write, return None.
-            return None
+        watcher = _get_db_watcher()
+        if watcher is None:
+            return _poll_local_db_state()
+        watcher.check_if_due()
+        return watcher.state
     # For production, we don't need file-based tracking.
     return "production"
 
 # --- Connection Management ---
 
+# Every Supabase request is abandoned after this many seconds, rather than the client's default of two minutes.
+SUPABASE_REQUEST_TIMEOUT_SECONDS = float(os.environ.get("SUPABASE_REQUEST_TIMEOUT_SECONDS", 10))
+
 @st.cache_resource(ttl=300)
 def init_supabase_connection():
     """Initializes and caches the Supabase (Production) connection."""
     try:
         url = os.environ.get("SUPABASE_URL")
         key = os.environ.get("SUPABASE_KEY")
-        return st.connection("supabase", type=SupabaseConnection, url=url, key=key)
+        connection = st.connection("supabase", type=SupabaseConnection, url=url, key=key)
+        # The client builds its PostgREST session from these options on first use (and after each token refresh).
+        connection.client.options.postgrest_client_timeout = httpx.Timeout(SUPABASE_REQUEST_TIMEOUT_SECONDS)
+        return connection
     except Exception as e:
         st.error(f"Failed to initialize Supabase connection: {e}. Check environment variables.")
         return None
 
+# Process-wide read-only engine for the local database, rebuilt whenever the file identity changes.
+_local_engine = None
+_local_engine_identity = None
+_local_engine_lock = threading.Lock()
+
+def _get_local_engine(local_db_path: Path, db_identity):
+    """
+    Returns the pooled read-only engine for the given database file identity.
+    If the ETL has swapped in a new file since the engine was built, the old
+    engine is disposed of and a new one is created for the new file.
+    """
+    global _local_engine, _local_engine_identity
+    with _local_engine_lock:
+        if _local_engine is not None and _local_engine_identity == db_identity:
+            return _local_engine
+
+        if _local_engine is not None:
+            # Connections currently checked out finish their read and are closed on return.
+            _local_engine.dispose()
+
+        # 'mode=ro' never takes a write lock and 'immutable=1' skips file locking entirely,
+        # so the pooled connections can never block the ETL from replacing the file.
+        # The ETL swaps the file atomically, so open connections keep reading the old snapshot.
+        db_uri = f"file:{quote(local_db_path.resolve().as_posix())}?mode=ro&immutable=1"
+        _local_engine = create_engine(f"sqlite:///{db_uri}&uri=true")
+        _local_engine_identity = db_identity
+        return _local_engine
+
 def init_local_connection():
     """
-    Initializes a new, non-cached connection to the local SQLite database.
-    This is intentionally not cached with @st.cache_resource to prevent a
-    persistent file lock, which would block the ETL process from replacing the database file.
-    A new connection engine is created for each query and then disposed of.
+    Returns the long-lived, read-only connection pool for the local SQLite database.
+    The engine is keyed on the database file's identity (inode, mtime and size from
+    get_local_db_state), so it is disposed of and rebuilt automatically when the ETL
+    replaces the database file. Connections are opened read-only and immutable, which
+    means they take no file locks and never block the ETL process.
     """
     try:
         local_db_path_str = os.environ.get("LOCAL_DB_PATH")
@@ -71,8 +228,7 @@ def init_local_connection():
             st.error(f"Local database file not found at the container path: {local_db_path}")
             return None
 
-        # Return a new engine every time to avoid locking the file.
-        return create_engine(f"sqlite:///{local_db_path.resolve()}")
+        return _get_local_engine(local_db_path, get_local_db_state())
     except Exception as e:
         st.error(f"Failed to initialize local SQLite connection: {e}")
         return None
@@ -81,7 +237,7 @@ def init_connection():
     """
     Initializes a connection to the database based on environment variables.
     - Production (Supabase) connections are cached for performance.
-    - Local (SQLite) connections are NOT cached to prevent file locks.
+    - Local (SQLite) connections come from a read-only pool that is rebuilt when the file is replaced.
     """
     data_source = os.environ.get("DATA_SOURCE", "Online (Production)")
 
@@ -90,48 +246,1956 @@ def init_connection():
     else: # Local (Development)
         return init_local_connection()
 
-@st.cache_data(ttl=300)
-def load_table(table_name: str) -> pd.DataFrame:
+# --- Table Queries ---
+
+# Filter operators accepted by load_table(where=...). The names match PostgREST's operators.
+WHERE_OPERATORS = ('eq', 'neq', 'gt', 'gte', 'lt', 'lte', 'in')
+
+class TableQuery(NamedTuple):
+    """The normalised, hashable shape of a load_table query. Used as part of the cache key."""
+    columns: Optional[tuple] = None
+    where: Optional[tuple] = None
+    order_by: Optional[tuple] = None
+    limit: Optional[int] = None
+
+def build_table_query(columns=None, where=None, order_by=None, limit=None) -> TableQuery:
     """
-    Loads an entire pre-aggregated table from the selected database.
-    For local development, this function's cache is automatically invalidated
-    when the database file is updated by the ETL process.
+    Normalises the load_table arguments into a TableQuery.
+    - columns: a list of column names to select. None selects every column.
+    - where: a list of (column, operator, value) filters, all of which must match.
+      The operator is one of WHERE_OPERATORS; 'in' takes a list of values.
+    - order_by: a column name or list of column names. Prefix a name with '-' to sort descending.
+    - limit: the maximum number of rows to return.
     """
-    # By calling this function, we make st.cache_data aware of the db file's state.
-    # When the file changes, the output of get_local_db_state() changes, and
-    # Streamlit automatically invalidates the cache for this function.
-    get_local_db_state()
-    
-    conn = init_connection()
-    if conn is None: 
-        st.error("Database connection is not available.")
-        return pd.DataFrame()
+    if columns is not None:
+        columns = tuple(columns)
+
+    if where:
+        normalised_where = []
+        for column_name, operator, value in where:
+            if operator not in WHERE_OPERATORS:
+                raise ValueError(f"Unsupported where operator '{operator}'. Use one of {WHERE_OPERATORS}.")
+            if operator == 'in':
+                value = tuple(value)
+            normalised_where.append((column_name, operator, value))
+        where = tuple(normalised_where)
+    else:
+        where = None
+
+    if isinstance(order_by, str):
+        order_by = (order_by,)
+    order_by = tuple((name.lstrip('-'), not name.startswith('-')) for name in order_by) if order_by else None
+
+    return TableQuery(columns, where, order_by, int(limit) if limit is not None else None)
+
+def _build_sql_query(table_name: str, query: TableQuery):
+    """Translates a TableQuery into a SQLAlchemy SELECT statement for the local backend."""
+    if query.columns:
+        statement = select(*[column(name) for name in query.columns]).select_from(table(table_name))
+    else:
+        statement = select(text('*')).select_from(table(table_name))
+
+    for column_name, operator, value in query.where or ():
+        col = column(column_name)
+        condition = {
+            'eq': lambda: col == value,
+            'neq': lambda: col != value,
+            'gt': lambda: col > value,
+            'gte': lambda: col >= value,
+            'lt': lambda: col < value,
+            'lte': lambda: col <= value,
+            'in': lambda: col.in_(value),
+        }[operator]()
+        statement = statement.where(condition)
+
+    for column_name, ascending in query.order_by or ():
+        statement = statement.order_by(column(column_name).asc() if ascending else column(column_name).desc())
+
+    if query.limit is not None:
+        statement = statement.limit(query.limit)
+    return statement
+
+def _build_supabase_query(client, table_name: str, query: TableQuery, count=None, head=None, apply_limit=True):
+    """Translates a TableQuery into a PostgREST request for the production backend."""
+    request = client.table(table_name).select(
+        ",".join(query.columns) if query.columns else "*", count=count, head=head
+    )
+
+    for column_name, operator, value in query.where or ():
+        # postgrest-py names the 'in' filter 'in_' to avoid the Python keyword.
+        request = getattr(request, 'in_' if operator == 'in' else operator)(column_name, value)
+
+    if head:
+        return request
+
+    for column_name, ascending in query.order_by or ():
+        request = request.order(column_name, desc=not ascending)
+
+    if apply_limit and query.limit is not None:
+        request = request.limit(query.limit)
+    return request
 
+# --- Supabase Circuit Breaker ---
+
+# After this many consecutive failed requests, Supabase requests fail straight away for
+# SUPABASE_BREAKER_RESET_SECONDS, after which a single trial request is let through.
+SUPABASE_BREAKER_FAILURES = int(os.environ.get("SUPABASE_BREAKER_FAILURES", 3))
+SUPABASE_BREAKER_RESET_SECONDS = float(os.environ.get("SUPABASE_BREAKER_RESET_SECONDS", 30))
+
+class SupabaseUnavailableError(RuntimeError):
+    """Raised instead of sending a request while the Supabase circuit breaker is open."""
+
+class _CircuitBreaker:
+    """
+    Stops sending requests to a backend that keeps failing, so a Supabase outage costs each
+    page an immediate error rather than a timeout per request.
+    - Closed: requests go through and consecutive failures are counted.
+    - Open: requests are refused until reset_seconds have passed since the last failure.
+    - Half-open: one trial request goes through. Success closes the breaker, failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self._lock = threading.Lock()
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """True if a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self._reset_seconds:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        """Closes the breaker after a request that got an answer from the backend."""
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Supabase is responding again, closing the circuit breaker.")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Counts a failed request, opening the breaker once there are too many in a row."""
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self._failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("Supabase failed %d requests in a row, pausing requests for %.0fs.", self._failures, self._reset_seconds)
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def status(self) -> dict:
+        """Returns the breaker's state, its consecutive failure count and the seconds until the next trial request."""
+        with self._lock:
+            if self._opened_at is None:
+                return {'state': 'closed', 'failures': self._failures, 'retry_in_seconds': 0.0}
+            retry_in = max(0.0, self._reset_seconds - (time.monotonic() - self._opened_at))
+            return {'state': 'open' if retry_in > 0 else 'half-open', 'failures': self._failures, 'retry_in_seconds': retry_in}
+
+_supabase_breaker = _CircuitBreaker(SUPABASE_BREAKER_FAILURES, SUPABASE_BREAKER_RESET_SECONDS)
+
+def _is_backend_failure(e: Exception) -> bool:
+    """
+    True if an error means Supabase itself is unreachable or unwell (timeouts, network
+    errors, 5xx responses and PostgREST's PGRST0xx connection errors), rather than the
+    request being invalid, e.g. for a missing table or column.
+    """
+    if isinstance(e, (httpx.TransportError, SupabaseUnavailableError)):
+        return True
+    if isinstance(e, APIError):
+        code = str(e.code or '')
+        return (code.isdigit() and int(code) >= 500) or code.startswith('PGRST0')
+    return False
+
+def _execute_supabase(request):
+    """Sends a PostgREST request through the circuit breaker. Raises SupabaseUnavailableError while it is open."""
+    if not _supabase_breaker.allow():
+        raise SupabaseUnavailableError("Supabase is not responding, so requests are paused for a moment.")
+    try:
+        response = request.execute()
+    except Exception as e:
+        if _is_backend_failure(e):
+            _supabase_breaker.record_failure()
+        else:
+            _supabase_breaker.record_success()
+        raise
+    _supabase_breaker.record_success()
+    return response
+
+def get_backend_status() -> dict:
+    """Returns the Supabase circuit breaker's state: 'closed' (healthy), 'open' or 'half-open'."""
+    return _supabase_breaker.status()
+
+# --- Supabase Range Fetching ---
+
+# PostgREST caps every response at the project's max-rows setting (1000 by default on Supabase),
+# so tables are fetched in pages of this many rows.
+SUPABASE_PAGE_SIZE = int(os.environ.get("SUPABASE_PAGE_SIZE", 1000))
+
+# Pages are fetched concurrently on this shared pool. Every request goes through the Supabase
+# client's single pooled HTTP/2 session, so the pages are multiplexed over one connection.
+_supabase_fetch_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("SUPABASE_FETCH_WORKERS", 4)),
+    thread_name_prefix="supabase-fetch"
+)
+
+# Paginated fetches are ordered by this unique key after the query's own order_by.
+# Tables without it are ordered by all of their columns instead.
+SUPABASE_PAGINATION_KEY = os.environ.get("SUPABASE_PAGINATION_KEY", "id")
+
+def _pagination_query(client, table_name: str, query: TableQuery) -> TableQuery:
+    """
+    Returns the query with a total row order added, so that every page sees the rows in the same
+    order. Postgres gives no such guarantee without an ORDER BY, so pages could overlap or skip rows.
+    The query's own order comes first, then SUPABASE_PAGINATION_KEY if the table has it, or else
+    every column, so that only identical rows can tie.
+    """
+    sample = _execute_supabase(client.table(table_name).select("*").limit(1)).data
+    table_columns = list(sample[0]) if sample else list(query.columns or ())
+    tie_breakers = [SUPABASE_PAGINATION_KEY] if SUPABASE_PAGINATION_KEY in table_columns else list(query.columns or table_columns)
+    ordered = {name for name, _ in query.order_by or ()}
+    return query._replace(order_by=(query.order_by or ()) + tuple((name, True) for name in tie_breakers if name not in ordered))
+
+def _fetch_supabase_rows(client, table_name: str, query: TableQuery) -> list:
+    """
+    Fetches every row matching a query from Supabase, working around the max-rows cap.
+    The matching rows are counted first with a HEAD request, then the row ranges are
+    requested in parallel and stitched back together in order. If the count is
+    unavailable, pages are requested one after another until a short page is returned.
+    Whenever more than one page is requested, they are fetched in a total order, see _pagination_query.
+    """
+    count_response = _execute_supabase(_build_supabase_query(client, table_name, query, count="exact", head=True))
+    total_rows = count_response.count
+
+    if total_rows is None:
+        query = _pagination_query(client, table_name, query)
+        rows = []
+        while query.limit is None or len(rows) < query.limit:
+            start = len(rows)
+            end = start + SUPABASE_PAGE_SIZE - 1
+            if query.limit is not None:
+                end = min(end, query.limit - 1)
+            page = _execute_supabase(_build_supabase_query(client, table_name, query, apply_limit=False).range(start, end)).data
+            rows.extend(page)
+            if len(page) < end - start + 1:
+                break
+        return rows
+
+    if query.limit is not None:
+        total_rows = min(total_rows, query.limit)
+
+    def fetch_page(start):
+        end = min(start + SUPABASE_PAGE_SIZE, total_rows) - 1
+        return _execute_supabase(_build_supabase_query(client, table_name, query, apply_limit=False).range(start, end)).data
+
+    page_starts = range(0, total_rows, SUPABASE_PAGE_SIZE)
+    if len(page_starts) <= 1:
+        return list(chain.from_iterable(fetch_page(start) for start in page_starts))
+    query = _pagination_query(client, table_name, query)
+    # map() returns the pages in request order, regardless of which finishes first.
+    return list(chain.from_iterable(_supabase_fetch_pool.map(fetch_page, page_starts)))
+
+# --- Database Versioning ---
+
+@st.cache_data(ttl=60)
+def _get_remote_db_version():
+    """
+    Returns the last ETL run time recorded in the production run_metadata table.
+    This is a single-row probe, so it is cheap to repeat every minute.
+    Raises if it cannot be read, so a failed probe is not cached.
+    """
+    conn = init_supabase_connection()
+    rows = _fetch_supabase_rows(conn.client, 'run_metadata', build_table_query(columns=['last_updated_utc'], limit=1))
+    return rows[0]['last_updated_utc'] if rows else None
+
+# The last version read from run_metadata, kept for when Supabase can't be reached.
+_last_remote_db_version = None
+
+def get_db_version():
+    """
+    Returns a value that changes whenever the ETL publishes new data.
+    - Local (SQLite): the file watcher's version counter, which is bumped as soon as the
+      ETL replaces the database file. Without a watcher, the file's identity is polled.
+    - Production (Supabase): run_metadata.last_updated_utc. While Supabase can't be reached,
+      the last version read is kept so stored tables stay current. If no version has been
+      read yet, a five minute time bucket is used so tables still refresh periodically.
+    """
+    global _last_remote_db_version
     data_source = os.environ.get("DATA_SOURCE", "Online (Production)")
+    if data_source == 'Online (Production)':
+        try:
+            remote_version = _get_remote_db_version()
+        except Exception:
+            remote_version = _last_remote_db_version
+        else:
+            if remote_version is not None:
+                _last_remote_db_version = remote_version
+        return remote_version if remote_version is not None else f"ttl-{int(time.time() // 300)}"
+    watcher = _get_db_watcher()
+    if watcher is not None:
+        watcher.check_if_due()
+        return watcher.version
+    return get_local_db_state()
 
+# --- Per-Table Fingerprints ---
+
+@contextmanager
+def _local_connection_scope(conn):
+    """Yields a SQLAlchemy connection, checking one out of the pool if given an engine."""
+    if isinstance(conn, Engine):
+        with conn.connect() as connection:
+            yield connection
+    else:
+        yield conn
+
+def _fingerprint_local_table(table_name: str, conn, rebuild_marker=None):
+    """
+    Returns the row count, latest Timestamp, content checksum and rebuild marker of a local
+    table, or None if the table has no Timestamp column.
+    The ETL can rewrite existing rows (e.g. re-valued drops or renamed players) without
+    changing the count or latest Timestamp, so every column is also summed in the same
+    aggregate: numbers by value, text by length and first character. SQLite runs it in C
+    over the file, which is far cheaper than reading the table into pandas. Only edits
+    that keep every sum the same, e.g. a name changed to another with the same length and
+    first letter, go unnoticed.
+    """
+    with _local_connection_scope(conn) as connection:
+        preparer = connection.dialect.identifier_preparer
+        quoted_name = preparer.quote(table_name)
+        column_names = [row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({quoted_name})")]
+        if 'Timestamp' not in column_names:
+            return None
+        sums = []
+        for column_name in column_names:
+            quoted_column = preparer.quote(column_name)
+            sums.append(f"total(CASE WHEN typeof({quoted_column}) IN ('integer', 'real') THEN {quoted_column} ELSE length({quoted_column}) END)")
+            sums.append(f"total(unicode({quoted_column}))")
+        row = connection.exec_driver_sql(f'SELECT count(*), max("Timestamp"), {", ".join(sums)} FROM {quoted_name}').one()
+    return (row[0], row[1], tuple(row[2:]), rebuild_marker)
+
+def _fingerprint_supabase_table(table_name: str, conn, rebuild_marker=None):
+    """
+    Returns the row count, latest Timestamp and rebuild marker of a Supabase table, or None
+    if the table has no Timestamp column. Only the append-only, timestamped tables can be
+    trusted to change their count or latest timestamp whenever their content changes.
+    Unlike the local fingerprint there is no content checksum, as PostgREST can't aggregate
+    without a database function: an ETL run that rewrites existing rows but keeps the count
+    and latest Timestamp is only noticed if it also bumps run_metadata.last_rebuild_utc.
+    """
+    count_response = _execute_supabase(conn.client.table(table_name).select("*", count="exact", head=True))
     try:
+        # Postgres sorts NULLs first in descending order, which would hide the latest timestamp.
+        latest_query = conn.client.table(table_name).select("Timestamp").order("Timestamp", desc=True, nullsfirst=False).limit(1)
+        latest = _execute_supabase(latest_query).data
+    except Exception as e:
+        if _is_backend_failure(e):
+            raise
+        return None
+    return (count_response.count, latest[0]['Timestamp'] if latest else None, rebuild_marker)
+
+# db_version -> run_metadata.last_rebuild_utc, see _get_rebuild_marker.
+_rebuild_markers = {}
+_rebuild_markers_lock = threading.Lock()
+
+def _get_rebuild_marker(db_version, conn):
+    """
+    Returns run_metadata.last_rebuild_utc for a database version, or None if the
+    ETL doesn't record it. The ETL bumps it when it rewrites existing rows (e.g. after merging
+    accounts) rather than only appending new ones, which forces incremental refreshes to do
+    a full reload.
+    """
+    with _rebuild_markers_lock:
+        if db_version in _rebuild_markers:
+            return _rebuild_markers[db_version]
+    try:
+        if os.environ.get("DATA_SOURCE", "Online (Production)") == 'Online (Production)':
+            rows = _fetch_supabase_rows(conn.client, 'run_metadata', build_table_query(limit=1))
+        else: # Local (Development)
+            with _local_connection_scope(conn) as connection:
+                rows = connection.exec_driver_sql("SELECT * FROM run_metadata LIMIT 1").mappings().all()
+        marker = rows[0].get('last_rebuild_utc') if rows else None
+    except Exception as e:
+        if _is_backend_failure(e):
+            raise
+        marker = None
+    with _rebuild_markers_lock:
+        _rebuild_markers.clear()
+        _rebuild_markers[db_version] = marker
+    return marker
+
+# (table_name, db_version) -> table version. Kept as a plain dict rather than st.cache_data
+# so tables can be fingerprinted from background threads without a script context.
+_table_versions = {}
+_table_versions_lock = threading.Lock()
+
+def _get_table_fingerprint(table_name: str, db_version, conn):
+    """
+    Fingerprints a table for a database version. Cached, so each table is only
+    fingerprinted once per ETL run. Falls back to the database version itself
+    (i.e. "always reload") if the table cannot be fingerprinted, which for the local
+    database is the file's identity. Raises, without caching anything, if Supabase
+    can't be reached.
+    """
+    key = (table_name, db_version)
+    with _table_versions_lock:
+        if key in _table_versions:
+            return _table_versions[key]
+
+    data_source = os.environ.get("DATA_SOURCE", "Online (Production)")
+    try:
+        rebuild_marker = _get_rebuild_marker(db_version, conn)
         if data_source == 'Online (Production)':
-            response = conn.client.table(table_name).select("*").execute()
-            df = pd.DataFrame(response.data)
+            fingerprint = _fingerprint_supabase_table(table_name, conn, rebuild_marker)
         else: # Local (Development)
-            # Using the connection object directly ensures it's properly closed
-            # after the read operation, further helping to prevent file locks.
-            with conn.connect() as connection:
-                df = pd.read_sql_table(table_name, connection)
-
-        if 'Timestamp' in df.columns:
-            df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce', utc=True)
-        return df
+            fingerprint = _fingerprint_local_table(table_name, conn, rebuild_marker)
     except Exception as e:
-        if "relation" in str(e) and "does not exist" in str(e) or "no such table" in str(e).lower():
-            st.warning(f"Table '{table_name}' not found in '{data_source}' source. The ETL might not have run for it yet.")
-        else:
-            st.error(f"Error loading table '{table_name}' from '{data_source}': {e}")
+        if _is_backend_failure(e):
+            raise
+        fingerprint = None
+    if fingerprint is not None:
+        table_version = ('table', fingerprint)
+    elif data_source == 'Online (Production)':
+        table_version = ('db', db_version)
+    else: # Local (Development)
+        # Unlike the watcher's counter, the file's identity is the same after a restart,
+        # so these tables can still be read back from the Arrow cache.
+        table_version = ('file', get_local_db_state())
+
+    with _table_versions_lock:
+        # Forget fingerprints from older database versions.
+        for stale_key in [k for k in _table_versions if k[1] != db_version]:
+            del _table_versions[stale_key]
+        _table_versions[key] = table_version
+    return table_version
+
+def get_table_version(table_name: str, conn=None):
+    """
+    Returns a value that only changes when the content of the given table changes.
+    Each ETL run rewrites the whole database, but usually only a few tables actually
+    change, so caches keyed on this only reload the tables that did.
+    """
+    return _get_table_fingerprint(table_name, get_db_version(), conn if conn is not None else init_connection())
+
+# --- Shared Table Store ---
+
+def _is_missing_table_error(e: Exception) -> bool:
+    """True if the error means the table does not exist (yet) in the database."""
+    return "relation" in str(e) and "does not exist" in str(e) or "no such table" in str(e).lower()
+
+def _rows_to_frame(rows: list, query: TableQuery) -> pd.DataFrame:
+    """Builds a DataFrame from the row dicts returned by Supabase."""
+    return pd.DataFrame(rows, columns=list(query.columns) if query.columns else None)
+
+# Matches the 'Z' or '+HH:MM' UTC offset at the end of an ISO 8601 timestamp.
+_UTC_OFFSET_SUFFIX = re.compile(r'(Z|[+-]\d{2}:?\d{2})$')
+
+def _parse_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Converts a Timestamp column to tz-aware datetime64[ns, UTC] in a single vectorised pass.
+    - Datetimes are only localised or converted to UTC.
+    - Numbers are epoch seconds, or epoch milliseconds if too large to be seconds.
+    - Strings are ISO 8601 in both backends: naive in SQLite and with a UTC offset in Supabase.
+      Arrow's ISO 8601 cast parses either shape far faster than pandas. Columns mixing shapes
+      fall back to pandas, which infers each value's format.
+    Unparseable values become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values.dt.tz_localize('UTC') if values.dt.tz is None else values.dt.tz_convert('UTC')
+    elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        unit = 'ms' if values.abs().max() > 1e11 else 's'
+        parsed = pd.to_datetime(values, unit=unit, errors='coerce', utc=True)
+    else:
+        parsed = None
+        try:
+            strings = pa.array(values, type=pa.string(), from_pandas=True)
+            present = strings.drop_null()
+            # The first value decides whether the column carries UTC offsets, as a failed cast is slow.
+            has_offset = len(present) > 0 and _UTC_OFFSET_SUFFIX.search(present[0].as_py()) is not None
+            target = pa.timestamp('ns', tz='UTC') if has_offset else pa.timestamp('ns')
+            parsed = pd.Series(strings.cast(target).to_pandas(), index=values.index, name=values.name)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass
+        if parsed is None:
+            parsed = pd.to_datetime(values, format='mixed', errors='coerce', utc=True)
+        elif parsed.dt.tz is None:
+            parsed = parsed.dt.tz_localize('UTC')
+    return parsed.astype('datetime64[ns, UTC]')
+
+def _normalise_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Applies the column conversions every loaded table gets."""
+    if 'Timestamp' in df.columns:
+        df['Timestamp'] = _parse_timestamps(df['Timestamp'])
+    return df
+
+def _read_table(table_name: str, query: TableQuery, conn) -> pd.DataFrame:
+    """
+    Runs a table query against the selected database. Raises on any error.
+    conn is the Supabase connection, or a local engine or an open connection.
+    """
+    data_source = os.environ.get("DATA_SOURCE", "Online (Production)")
+    if data_source == 'Online (Production)':
+        df = _rows_to_frame(_fetch_supabase_rows(conn.client, table_name, query), query)
+    else: # Local (Development)
+        # Check a connection out of the read-only pool (unless one was passed in) and return it once the read is done.
+        with _local_connection_scope(conn) as connection:
+            df = pd.read_sql_query(_build_sql_query(table_name, query), connection)
+    return _normalise_frame(df)
+
+# --- Incremental Supabase Refresh ---
+
+def _can_refresh_incrementally(entry, version, query: TableQuery) -> bool:
+    """
+    True if a stored entry can be brought up to a newer table version by fetching only the
+    rows added since, rather than reloading the whole table. Needs a Supabase table whose
+    fingerprint has a latest Timestamp, no rebuild since the entry was loaded, a query that
+    keeps the Timestamp column and no limit (new rows could push old ones out of it).
+    """
+    if os.environ.get("DATA_SOURCE", "Online (Production)") != 'Online (Production)':
+        return False
+    if entry is None or entry['notice'] or query.limit is not None:
+        return False
+    if entry['version'][0] != 'table' or version[0] != 'table':
+        return False
+    (old_count, old_latest, old_marker), (new_count, new_latest, new_marker) = entry['version'][1], version[1]
+    return (
+        old_latest is not None and new_latest is not None
+        and old_marker == new_marker
+        and new_count >= old_count
+        and 'Timestamp' in entry['frame'].columns
+    )
+
+def _read_table_delta(table_name: str, query: TableQuery, conn, entry, version):
+    """
+    Brings a stored frame up to a newer table version by fetching only the rows newer than
+    its latest Timestamp and merging them in. Returns None if the table changed in any other
+    way than gaining rows, i.e. its row count grew by more or less than the number of new
+    rows, in which case the caller does a full reload.
+    """
+    old_count, old_latest, _ = entry['version'][1]
+    new_count = version[1][0]
+
+    newer_rows = _execute_supabase(conn.client.table(table_name).select("*", count="exact", head=True).gt("Timestamp", old_latest)).count
+    if newer_rows is None or old_count + newer_rows != new_count:
+        return None
+
+    delta_query = query._replace(where=(query.where or ()) + (('Timestamp', 'gt', old_latest),))
+    delta = _normalise_frame(_rows_to_frame(_fetch_supabase_rows(conn.client, table_name, delta_query), delta_query))
+    if delta.empty:
+        return entry['frame']
+
+    merged = pd.concat([entry['frame'], delta], ignore_index=True)
+    if query.order_by:
+        merged = merged.sort_values(
+            by=[name for name, _ in query.order_by],
+            ascending=[ascending for _, ascending in query.order_by],
+            kind='stable',
+            ignore_index=True
+        )
+    return merged
+
+# --- Arrow Materialization Cache ---
+
+# Loaded tables are also written here as uncompressed Arrow IPC (Feather v2) files, so a
+# restarted server or a new worker can memory-map them instead of re-running the query.
+# Kept outside the source tree by default, so cache files never end up in a Docker image.
+TABLE_CACHE_DIR = Path(os.environ.get("DASHBOARD_CACHE_DIR", Path(tempfile.gettempdir()) / "au-osrs-dashboard" / "table_cache"))
+
+def _materialized_path(table_name: str, query: TableQuery, version):
+    """
+    Returns the Arrow file path for a table query at a table version, or None if the
+    version is not stable across restarts and so must never be read back from disk.
+    """
+    if version[0] == 'db' and not isinstance(version[1], str):
+        # The local file watcher's counter restarts from zero in every process.
+        return None
+    if version[0] == 'file' and version[1] is None:
+        # The database file was missing when the table was versioned.
+        return None
+    query_hash = hashlib.blake2b(repr(query).encode(), digest_size=8).hexdigest()
+    version_hash = hashlib.blake2b(repr(version).encode(), digest_size=8).hexdigest()
+    return TABLE_CACHE_DIR / f"{table_name}-{query_hash}-{version_hash}.arrow"
+
+def _latest_materialized_path(table_name: str, query: TableQuery):
+    """Returns the newest Arrow file for a table query, whatever its version, or None if there is none."""
+    query_hash = hashlib.blake2b(repr(query).encode(), digest_size=8).hexdigest()
+    try:
+        return max(TABLE_CACHE_DIR.glob(f"{table_name}-{query_hash}-*.arrow"), key=lambda path: path.stat().st_mtime, default=None)
+    except OSError:
+        return None
+
+def _read_materialized(path: Path):
+    """
+    Memory-maps a materialized table. Returns the frame and its size before dtype
+    compaction, or (None, None) if it has not been written.
+    """
+    if path is None or not path.exists():
+        return None, None
+    try:
+        # The frame's numeric columns point straight into the mapped file. The mapping
+        # stays alive for as long as the frame does, and the OS shares its pages.
+        arrow_table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        raw_nbytes = (arrow_table.schema.metadata or {}).get(b'raw_nbytes')
+        return arrow_table.to_pandas(split_blocks=True), int(raw_nbytes) if raw_nbytes else None
+    except Exception as e:
+        logger.warning("Ignoring unreadable table cache file %s: %s", path, e)
+        return None, None
+
+def _write_materialized(path: Path, frame: pd.DataFrame, raw_nbytes=None):
+    """
+    Writes a table to the Arrow cache and removes older versions of the same query.
+    The file is written under a temporary name and renamed, so readers never see a partial file.
+    """
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrow_table = pa.Table.from_pandas(frame, preserve_index=False)
+        if raw_nbytes is not None:
+            arrow_table = arrow_table.replace_schema_metadata({**(arrow_table.schema.metadata or {}), b'raw_nbytes': str(raw_nbytes).encode()})
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with pa.OSFile(str(temp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+        os.replace(temp_path, path)
+
+        query_prefix = path.name.rsplit('-', 1)[0]
+        for old_path in path.parent.glob(f"{query_prefix}-*.arrow"):
+            if old_path != path:
+                old_path.unlink(missing_ok=True)
+    except Exception as e:
+        # The cache is only an optimisation, e.g. the directory may be read-only.
+        logger.warning("Could not write table cache file %s: %s", path, e)
+
+# --- Compact Dtypes ---
+
+# Columns holding names that repeat across many rows. They are stored as categories (a small
+# integer code per row plus a single copy of each distinct string) when they repeat enough.
+CATEGORY_COLUMNS = ('Username', 'Item_Name', 'Group', 'Broadcast_Type', 'Action_By', 'Opponent', 'Skill', 'Tier')
+# A column only becomes a category if it has at most this many distinct values per row.
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+def _is_count_or_value_column(name: str) -> bool:
+    """True for the ETL's Count_<period>, Value_<period> and Item_Value columns."""
+    return name.startswith('Count_') or name.startswith('Value_') or name == 'Item_Value'
+
+def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrinks a loaded table's dtypes based on the dashboard's column naming scheme:
+    - CATEGORY_COLUMNS become categories when their values repeat.
+    - Count and value columns holding only whole numbers become int32 when they fit,
+      and int64 otherwise. GP totals can pass two billion, so they are never forced into int32.
+    """
+    for name in df.columns:
+        series = df[name]
+        if name in CATEGORY_COLUMNS:
+            if series.dtype == object and len(series) and series.nunique() <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+                df[name] = series.astype('category')
+        elif _is_count_or_value_column(name) and pd.api.types.is_numeric_dtype(series) and len(series):
+            if series.isna().any() or (pd.api.types.is_float_dtype(series) and not (series % 1 == 0).all()):
+                continue
+            if series.min() >= INT32_MIN and series.max() <= INT32_MAX:
+                df[name] = series.astype('int32')
+            elif pd.api.types.is_float_dtype(series):
+                df[name] = series.astype('int64')
+    return df
+
+# Memory budget of the shared table store. Least recently used tables are evicted beyond it.
+TABLE_CACHE_BUDGET_MB = float(os.environ.get("DASHBOARD_CACHE_MB", 512))
+# After the ETL publishes a new version, a stored table keeps being served while it is refreshed
+# in the background (stale-while-revalidate), for at most this many seconds. Beyond that, or if
+# the refresh keeps failing, visitors wait for the refresh like on a cache miss.
+TABLE_MAX_STALENESS_SECONDS = float(os.environ.get("TABLE_MAX_STALENESS_SECONDS", 600))
+
+# Background refreshes of stale tables run on this pool.
+_table_revalidate_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="table-revalidate")
+
+class _SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers arriving while a call with the same key
+    is in flight wait for it and share its result, or its exception, instead of repeating it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def do(self, key, fn):
+        """Returns fn(), or the result of the identical call already in flight. Also returns whether the call was shared."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[key] = Future()
+        if not is_leader:
+            return future.result(), True
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result(), False
+
+class _TableStore:
+    """
+    Process-wide store holding a single copy of each loaded table per table version.
+    Unlike st.cache_data, which pickles a fresh copy of a frame for every caller, the store
+    hands out shallow copies that share the same underlying data between all sessions.
+    Entries are kept in least recently used order and evicted once their combined
+    memory_usage(deep=True) passes the budget.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self._lock = threading.Lock()
+        # (table_name, query) -> {'version', 'generation', 'db_version', 'stale_since', 'frame',
+        # 'notice', 'nbytes', 'raw_nbytes', 'loaded_at'}, least recently used first.
+        # 'generation' is unique to each entry, so caches derived from an entry's frame can be
+        # keyed on it: one table version can be held by several entries, e.g. one per query.
+        self._entries = OrderedDict()
+        self._generations = count()
+        self._budget_bytes = budget_bytes
+        self._total_bytes = 0
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # Keys with a background refresh queued or running.
+        self._revalidating = set()
+        # Coalesces concurrent loads of the same query at the same database version.
+        self._loads = _SingleFlight()
+        self._coalesced = 0
+
+    def get_current(self, table_name: str, query: TableQuery, db_version, conn, background_conn=None):
+        """
+        Returns the entry for a query as of a database version, fingerprinting the table
+        and loading it through conn as needed.
+        If background_conn is given and the stored entry was last confirmed under an older
+        database version, the stale entry is returned straight away and refreshed in the
+        background through background_conn, for up to TABLE_MAX_STALENESS_SECONDS.
+        """
+        entry = self.get_stored(table_name, query, db_version, background_conn)
+        if entry is None:
+            entry = self._load_current(table_name, query, db_version, conn)
+        return entry
+
+    def get_stored(self, table_name: str, query: TableQuery, db_version, background_conn=None):
+        """
+        Returns the entry for a query if it can be served without loading anything: it is
+        current for the database version, or it can be served stale while background_conn
+        refreshes it (see get_current). Returns None if the query has to be loaded.
+        """
+        key = (table_name, query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['db_version'] == db_version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            serve_stale = (
+                entry is not None and background_conn is not None
+                and (entry['stale_since'] is None or now - entry['stale_since'] < TABLE_MAX_STALENESS_SECONDS)
+            )
+            if not serve_stale:
+                return None
+            if entry['stale_since'] is None:
+                entry['stale_since'] = now
+            self._entries.move_to_end(key)
+            self._stale_hits += 1
+            start_refresh = key not in self._revalidating
+            self._revalidating.add(key)
+
+        if start_refresh:
+            _table_revalidate_pool.submit(self._revalidate, table_name, query, db_version, background_conn)
+        return entry
+
+    def _load_current(self, table_name: str, query: TableQuery, db_version, conn):
+        """
+        Fingerprints and loads a query for a database version. When many sessions miss the
+        same query at once, e.g. straight after an ETL run, only the first does the work and
+        the rest wait for and share its entry.
+        """
+        entry, shared = self._loads.do(
+            (table_name, query, db_version),
+            lambda: self.get(table_name, query, _get_table_fingerprint(table_name, db_version, conn), conn, db_version)
+        )
+        if shared:
+            with self._lock:
+                self._coalesced += 1
+        return entry
+
+    def _revalidate(self, table_name: str, query: TableQuery, db_version, conn):
+        """Brings a stale entry up to a database version. The new entry replaces it once fully loaded."""
+        try:
+            self._load_current(table_name, query, db_version, conn)
+        except Exception as e:
+            # The stale entry keeps being served until TABLE_MAX_STALENESS_SECONDS runs out.
+            logger.warning("Background refresh of '%s' failed: %s", table_name, e)
+        finally:
+            with self._lock:
+                self._revalidating.discard((table_name, query))
+
+    def get_last_good(self, table_name: str, query: TableQuery):
+        """
+        Returns the last successfully loaded entry for a query, whatever its version, for when
+        the database can't be reached. Falls back to the query's materialized copy on disk
+        (e.g. after a restart), which is then kept in the store. Returns None if neither exists.
+        """
+        key = (table_name, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        path = _latest_materialized_path(table_name, query)
+        frame, raw_nbytes = _read_materialized(path)
+        if frame is None:
+            return None
+        nbytes = int(frame.memory_usage(deep=True).sum())
+        entry = {
+            'version': ('snapshot', path.name),
+            'generation': next(self._generations),
+            'db_version': None,
+            'stale_since': None,
+            'frame': frame,
+            'notice': None,
+            'nbytes': nbytes,
+            'raw_nbytes': raw_nbytes if raw_nbytes is not None else nbytes,
+            'loaded_at': datetime.fromtimestamp(path.stat().st_mtime, timezone.utc),
+        }
+        with self._lock:
+            if key in self._entries:
+                # Loaded properly in the meantime.
+                return self._entries[key]
+            self._entries[key] = entry
+            self._total_bytes += nbytes
+            self._evict_over_budget(keep=key)
+        return entry
+
+    def get(self, table_name: str, query: TableQuery, version, conn, db_version=None):
+        """
+        Returns the stored entry for a query, loading it through conn if missing or
+        from an older table version. Makes no Streamlit calls, so it is safe to use
+        from background threads. db_version, if given, is recorded as the database
+        version the entry was last confirmed under.
+        """
+        key = (table_name, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['version'] == version:
+                # The table is unchanged in this database version, so the entry is current again.
+                if db_version is not None:
+                    entry['db_version'] = db_version
+                    entry['stale_since'] = None
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            self._misses += 1
+
+        notice = None
+        materialized_path = _materialized_path(table_name, query, version)
+        frame, raw_nbytes = _read_materialized(materialized_path)
+        if frame is None and _can_refresh_incrementally(entry, version, query):
+            try:
+                frame = _read_table_delta(table_name, query, conn, entry, version)
+            except Exception as e:
+                logger.warning("Incremental refresh of '%s' failed, reloading it in full: %s", table_name, e)
+                frame = None
+            if frame is not None:
+                raw_nbytes = int(frame.memory_usage(deep=True).sum())
+                frame = _compact_dtypes(frame)
+                _write_materialized(materialized_path, frame, raw_nbytes)
+        if frame is None:
+            try:
+                frame = _read_table(table_name, query, conn)
+                raw_nbytes = int(frame.memory_usage(deep=True).sum())
+                frame = _compact_dtypes(frame)
+                _write_materialized(materialized_path, frame, raw_nbytes)
+            except Exception as e:
+                if not _is_missing_table_error(e):
+                    raise
+                # A missing table is a valid state for this version, so remember it rather than retrying.
+                frame = pd.DataFrame()
+                notice = f"Table '{table_name}' not found in '{os.environ.get('DATA_SOURCE', 'Online (Production)')}' source. The ETL might not have run for it yet."
+
+        nbytes = int(frame.memory_usage(deep=True).sum())
+        entry = {
+            'version': version,
+            'generation': next(self._generations),
+            'db_version': db_version,
+            'stale_since': None,
+            'frame': frame,
+            'notice': notice,
+            'nbytes': nbytes,
+            'raw_nbytes': raw_nbytes if raw_nbytes is not None else nbytes,
+            'loaded_at': datetime.now(timezone.utc),
+        }
+        with self._lock:
+            replaced = self._entries.pop(key, None)
+            if replaced is not None:
+                self._total_bytes -= replaced['nbytes']
+            self._entries[key] = entry
+            self._total_bytes += nbytes
+            self._evict_over_budget(keep=key)
+        return entry
+
+    def _evict_over_budget(self, keep):
+        """Drops least recently used entries until the store fits its budget. Call with the lock held."""
+        while self._total_bytes > self._budget_bytes and len(self._entries) > 1:
+            oldest_key = next(iter(self._entries))
+            if oldest_key == keep:
+                # The entry just loaded is always kept, even if it alone is over budget.
+                self._entries.move_to_end(oldest_key)
+                continue
+            evicted = self._entries.pop(oldest_key)
+            self._total_bytes -= evicted['nbytes']
+            self._evictions += 1
+
+    def counters(self) -> dict:
+        """Returns the store's hit, stale hit, miss, coalesced load and eviction counts and its memory use against the budget."""
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'stale_hits': self._stale_hits,
+                'misses': self._misses,
+                'coalesced': self._coalesced,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'used_mb': self._total_bytes / 1024 ** 2,
+                'budget_mb': self._budget_bytes / 1024 ** 2,
+            }
+
+    def queries(self) -> list:
+        """Returns the (table_name, query) of every stored entry."""
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self) -> pd.DataFrame:
+        """Returns one row per stored table query with its size before and after dtype compaction, and its age."""
+        with self._lock:
+            entries = list(self._entries.items())
+        return pd.DataFrame(
+            [
+                {
+                    'Table': table_name,
+                    'Query': _describe_query(query),
+                    'Version': str(entry['version']),
+                    'Rows': len(entry['frame']),
+                    'Memory_MB': entry['nbytes'] / 1024 ** 2,
+                    'Raw_Memory_MB': entry['raw_nbytes'] / 1024 ** 2,
+                    'Loaded_At': entry['loaded_at'],
+                }
+                for (table_name, query), entry in entries
+            ],
+            columns=['Table', 'Query', 'Version', 'Rows', 'Memory_MB', 'Raw_Memory_MB', 'Loaded_At']
+        )
+
+def _describe_query(query: TableQuery) -> str:
+    """Returns a short human-readable description of a query shape."""
+    parts = [", ".join(query.columns) if query.columns else "*"]
+    if query.where:
+        parts.append("where " + " and ".join(f"{c} {op} {v}" for c, op, v in query.where))
+    if query.order_by:
+        parts.append("order by " + ", ".join(c if asc else f"-{c}" for c, asc in query.order_by))
+    if query.limit is not None:
+        parts.append(f"limit {query.limit}")
+    return " ".join(parts)
+
+@st.cache_resource
+def get_table_store() -> _TableStore:
+    """Returns the process-wide table store shared by every session."""
+    return _TableStore(int(TABLE_CACHE_BUDGET_MB * 1024 ** 2))
+
+def get_table_memory_stats() -> pd.DataFrame:
+    """Returns the tables currently held in the shared table store and their memory usage."""
+    return get_table_store().stats()
+
+def get_table_cache_counters() -> dict:
+    """Returns the shared table store's hit, miss and eviction counters and memory budget."""
+    return get_table_store().counters()
+
+def load_table(table_name: str, columns=None, where=None, order_by=None, limit=None) -> pd.DataFrame:
+    """
+    Loads a pre-aggregated table from the selected database.
+    Optionally selects only some columns, filters and sorts rows and limits the row count,
+    which is done by the database rather than in pandas. See build_table_query for the
+    argument formats.
+
+    Each query shape is loaded once per table version into the shared table store and
+    every caller receives a zero-copy view of it. When the ETL publishes new data, only
+    the tables whose content actually changed are reloaded on next access.
+
+    Example:
+        load_table("kicker_summary", columns=['Action_By', 'Count_YTD'],
+                   where=[('Count_YTD', 'gt', 0)], order_by='-Count_YTD')
+    """
+    return load_tables({table_name: (table_name, dict(columns=columns, where=where, order_by=order_by, limit=limit))})[table_name]
+
+# A page waits at most this long for its Supabase tables before falling back to the last good copies.
+# Loads still running carry on in the background and are picked up by the next rerun.
+TABLE_LOAD_TIMEOUT_SECONDS = float(os.environ.get("TABLE_LOAD_TIMEOUT_SECONDS", 30))
+
+# Table loads requested through load_tables() run concurrently on this pool. It is separate from
+# the Supabase page pool because each load waits on its own page fetches.
+_table_load_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("TABLE_LOAD_WORKERS", 8)),
+    thread_name_prefix="table-load"
+)
+
+def _normalize_table_requests(tables) -> dict:
+    """
+    Turns the load_tables argument into {key: (table_name, TableQuery)}.
+    Accepts a list of table names, or a dict mapping each result key to a table name
+    or to a (table_name, load_table keyword arguments) tuple.
+    """
+    if not isinstance(tables, dict):
+        tables = {table_name: table_name for table_name in tables}
+    normalized = {}
+    for key, spec in tables.items():
+        table_name, kwargs = (spec, {}) if isinstance(spec, str) else spec
+        normalized[key] = (table_name, build_table_query(**kwargs))
+    return normalized
+
+def load_tables(tables) -> dict:
+    """
+    Loads several tables at once and returns a dict of frames.
+    Tables that are not already in the shared table store are fetched together:
+    concurrently on a thread pool for Supabase, so the page pays for one round trip
+    rather than one per table, and through a single connection for the local database.
+
+    If a table can't be loaded, e.g. Supabase is down or slower than TABLE_LOAD_TIMEOUT_SECONDS,
+    the last successfully loaded copy is returned instead and the page shows a stale data
+    warning. Failures are never stored, so the next rerun tries the database again.
+
+    The frames share their data with every other session. Assigning whole columns and sorting
+    are safe, but call .copy() before changing values in place (.loc/.iloc, inplace fillna).
+
+    Example:
+        frames = load_tables({
+            "meta": "run_metadata",
+            "kills": ("pvp_kills_summary", {"where": [("Count_YTD", "gt", 0)]}),
+        })
+    """
+    entries = _load_entries(_normalize_table_requests(tables))
+    # A shallow copy shares the stored data; the caller gets its own columns and index.
+    return {
+        key: entry['frame'].copy(deep=False) if entry is not None else pd.DataFrame()
+        for key, entry in entries.items()
+    }
+
+def _load_entries(requests: dict) -> dict:
+    """
+    Does the work of load_tables for normalized requests, returning each key's store entry,
+    or None if it could not be loaded. Errors and warnings are shown on the page.
+    """
+    data_source = os.environ.get("DATA_SOURCE", "Online (Production)")
+
+    conn = init_connection()
+    if conn is None:
+        st.error("Database connection is not available.")
+        return {key: None for key in requests}
+
+    store = get_table_store()
+    db_version = get_db_version()
+    _start_warmup(db_version, conn)
+
+    def load_one(table_name, query, connection):
+        # Tables loaded under an older database version are served stale and refreshed through conn.
+        return store.get_current(table_name, query, db_version, connection, background_conn=conn)
+
+    # Queries the store can already answer are served on this thread, so they never wait in
+    # the pool behind other sessions' slow loads. Only the misses are loaded below.
+    results = {}
+    for key, (table_name, query) in requests.items():
+        entry = store.get_stored(table_name, query, db_version, background_conn=conn)
+        if entry is not None:
+            results[key] = entry
+    misses = {key: request for key, request in requests.items() if key not in results}
+
+    if data_source == 'Online (Production)':
+        futures = {
+            key: _table_load_pool.submit(load_one, table_name, query, conn)
+            for key, (table_name, query) in misses.items()
+        }
+        deadline = time.monotonic() + TABLE_LOAD_TIMEOUT_SECONDS
+        for key, future in futures.items():
+            try:
+                results[key] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                results[key] = TimeoutError(f"no response after {TABLE_LOAD_TIMEOUT_SECONDS:.0f}s")
+            except Exception as e:
+                results[key] = e
+    elif misses: # Local (Development)
+        # SQLite reads are CPU-bound, so one connection reading the tables back to back
+        # beats a thread per table. The immutable file gives every read the same snapshot.
+        with conn.connect() as connection:
+            for key, (table_name, query) in misses.items():
+                try:
+                    results[key] = load_one(table_name, query, connection)
+                except Exception as e:
+                    results[key] = e
+
+    entries = {}
+    stale_loaded_at = []
+    backend_down = data_source == 'Online (Production)' and get_backend_status()['state'] != 'closed'
+    for key, (table_name, query) in requests.items():
+        entry = results[key]
+        if isinstance(entry, Exception):
+            last_good = store.get_last_good(table_name, query)
+            if last_good is None:
+                st.error(f"Error loading table '{table_name}' from '{data_source}': {entry}")
+                entries[key] = None
+                continue
+            logger.warning("Serving the last good copy of '%s' after a failed load: %s", table_name, entry)
+            entry = last_good
+            stale_loaded_at.append(entry['loaded_at'])
+        elif backend_down:
+            # Nothing newer can be checked for until Supabase is back.
+            stale_loaded_at.append(entry['loaded_at'])
+        if entry['notice']:
+            st.warning(entry['notice'])
+        entries[key] = entry
+
+    if stale_loaded_at:
+        _show_stale_data_warning(min(stale_loaded_at))
+    return entries
+
+def _show_stale_data_warning(loaded_at: datetime):
+    """
+    Shows the saved data warning once per script run, however many loads in the run fell
+    back to saved data. Later loads update the run's warning to the oldest saved time.
+    """
+    ctx = get_script_run_ctx()
+    # The context's cursors are replaced at the start of every run, so they identify the run.
+    run = ctx.cursors if ctx is not None else None
+    shown = st.session_state.get('_stale_data_warning') if run is not None else None
+    if shown is not None and shown['run'] is run:
+        if loaded_at >= shown['loaded_at']:
+            return
+        placeholder = shown['placeholder']
+    else:
+        placeholder = st.empty()
+    if run is not None:
+        st.session_state['_stale_data_warning'] = {'run': run, 'loaded_at': loaded_at, 'placeholder': placeholder}
+    placeholder.warning(
+        f"The database can't be reached right now, so this page is showing saved data from "
+        f"{loaded_at:%d %b %Y %H:%M} UTC. It will update once the database is back.",
+        icon="⚠️"
+    )
+
+# --- Background Prefetching ---
+
+# Speculative loads run on a single worker so they never compete with the page's own loads
+# for more than one thread or database connection.
+_table_prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="table-prefetch")
+# (table_name, query, db_version) of prefetches that are queued or running.
+_pending_prefetches = set()
+_pending_prefetches_lock = threading.Lock()
+
+def prefetch_tables(tables):
+    """
+    Warms the shared table store in the background, without waiting for the result.
+    Takes the same argument as load_tables. Call it once the page has loaded what it
+    shows, with the tables the user is likely to ask for next, e.g. the other periods.
+    """
+    requests = _normalize_table_requests(tables)
+    conn = init_connection()
+    if conn is None:
+        return
+    store = get_table_store()
+    db_version = get_db_version()
+
+    def prefetch_one(prefetch_key, table_name, query):
+        try:
+            store.get_current(table_name, query, db_version, conn)
+        except Exception as e:
+            # The page will report the error if the table is actually requested.
+            logger.warning("Prefetch of '%s' failed: %s", table_name, e)
+        finally:
+            with _pending_prefetches_lock:
+                _pending_prefetches.discard(prefetch_key)
+
+    for table_name, query in requests.values():
+        prefetch_key = (table_name, query, db_version)
+        with _pending_prefetches_lock:
+            if prefetch_key in _pending_prefetches:
+                continue
+            _pending_prefetches.add(prefetch_key)
+        _table_prefetch_pool.submit(prefetch_one, prefetch_key, table_name, query)
+
+def prefetch_period_tables(table_template: str, current_suffix: str):
+    """
+    Prefetches a per-period table for every period except the one being shown, so
+    switching periods in the sidebar is served from memory.
+    table_template is formatted with the lower-case period suffix, e.g. "valuable_drops_detail_{}".
+    """
+    suffixes = ['Custom_Days', 'Prev_Week', 'Prev_Month', 'YTD', 'All_Time']
+    prefetch_tables([table_template.format(suffix.lower()) for suffix in suffixes if suffix != current_suffix])
+
+# --- Player Index ---
+
+# Every table that lists players, and the column holding their names.
+# The detail tables of the shorter periods are subsets of the all-time ones, so only those are indexed.
+PLAYER_TABLES = {
+    'valuable_drops_summary': 'Username',
+    'pvp_kills_summary': 'Username',
+    'pvp_deaths_summary': 'Username',
+    'kicked_by_player_summary': 'Username',
+    'kicker_summary': 'Action_By',
+    'stolen_whips_summary': 'Username',
+    'menaces_111_summary': 'Username',
+    'big_gzers_summary': 'Username',
+    'cya_hick_crew_summary': 'Username',
+    'personal_bests_summary': 'Holder',
+    'recent_achievements': 'Username',
+    'valuable_drops_detail_all_time': 'Username',
+    'pvp_kills_detail_all_time': 'Username',
+    'pvp_deaths_detail_all_time': 'Username',
+}
+# Columns holding a comma-separated list of players, e.g. a team holding a personal best.
+PLAYER_LIST_COLUMNS = {'Holder'}
+
+# table_name -> {'generation', 'positions', 'names'} for the store entry last indexed.
+_player_positions = {}
+_player_positions_lock = threading.Lock()
+_player_index_builds = _SingleFlight()
+
+def _player_key(name) -> str:
+    """Returns the lookup key for a player name. OSRS names ignore case and treat spaces and underscores alike."""
+    return re.sub(r'[\s_]+', ' ', str(name)).strip().casefold()
+
+def _index_player_rows(frame: pd.DataFrame, column: str):
+    """
+    Groups a table's row positions by player in one pass over the name column.
+    Returns ({player key: sorted row positions}, {player key: name as written in the table}).
+    """
+    names = pd.Series(frame[column].to_numpy(dtype=object), index=np.arange(len(frame)))
+    if column in PLAYER_LIST_COLUMNS:
+        names = names.dropna().astype(str).str.split(',').explode().str.strip()
+    names = names[names.notna() & (names != '')]
+
+    row_positions = names.index.to_numpy()
+    positions, display_names = {}, {}
+    for name, group in names.groupby(names.to_numpy(), sort=False).indices.items():
+        key = _player_key(name)
+        rows = row_positions[group]
+        if key in positions:
+            # The same player written two ways, e.g. with an underscore.
+            rows = np.unique(np.concatenate([positions[key], rows]))
+        positions[key] = rows
+        display_names.setdefault(key, name)
+    return positions, display_names
+
+def _get_player_positions(table_name: str, entry) -> dict:
+    """Returns the player index of a loaded table, building it once per store entry."""
+    generation = entry['generation']
+    with _player_positions_lock:
+        cached = _player_positions.get(table_name)
+        if cached is not None and cached['generation'] == generation:
+            return cached
+
+    def build():
+        frame, column = entry['frame'], PLAYER_TABLES[table_name]
+        positions, names = _index_player_rows(frame, column) if column in frame.columns else ({}, {})
+        index = {'generation': generation, 'positions': positions, 'names': names}
+        with _player_positions_lock:
+            _player_positions[table_name] = index
+        return index
+
+    index, _ = _player_index_builds.do((table_name, generation), build)
+    return index
+
+def _load_player_indexes(tables) -> dict:
+    """Loads the given player tables in full and returns {table_name: (entry, player index)}, skipping any that failed."""
+    tables = list(tables) if tables is not None else list(PLAYER_TABLES)
+    unknown = [table_name for table_name in tables if table_name not in PLAYER_TABLES]
+    if unknown:
+        raise ValueError(f"Tables {unknown} are not player tables. Use tables from PLAYER_TABLES.")
+    entries = _load_entries({table_name: (table_name, build_table_query()) for table_name in tables})
+    return {
+        table_name: (entry, _get_player_positions(table_name, entry))
+        for table_name, entry in entries.items() if entry is not None
+    }
+
+def lookup_player(username: str, tables=None) -> dict:
+    """
+    Returns {table_name: that player's rows} for every table in PLAYER_TABLES, or just the
+    given ones. Tables the player is not in get an empty frame with the table's columns.
+
+    Each table is indexed by player once per table version, so a lookup only touches the
+    player's own rows rather than scanning every table. Names match regardless of case
+    and of spaces vs. underscores.
+
+    Example:
+        rows = lookup_player("Zezima", tables=["pvp_deaths_summary", "recent_achievements"])
+    """
+    key = _player_key(username)
+    player_rows = {}
+    for table_name, (entry, index) in _load_player_indexes(tables).items():
+        positions = index['positions'].get(key)
+        frame = entry['frame']
+        player_rows[table_name] = frame.iloc[positions] if positions is not None else frame.iloc[0:0]
+    return player_rows
+
+def get_player_names(tables=None) -> list:
+    """Returns every player found in the player tables (or just the given ones), sorted case-insensitively."""
+    names = {}
+    for _, index in _load_player_indexes(tables).values():
+        for key, name in index['names'].items():
+            names.setdefault(key, name)
+    return sorted(names.values(), key=str.casefold)
+
+# --- Player Profiles ---
+
+# The ETL's reporting periods, as used in the summary tables' column names, shortest first.
+PERIOD_SUFFIXES = ['Custom_Days', 'Prev_Week', 'Prev_Month', 'YTD', 'All_Time']
+
+# The per-period stats on a player's profile: stat label -> (summary table, column prefix).
+PROFILE_STATS = {
+    'Valuable Drops': ('valuable_drops_summary', 'Count'),
+    'Drops Value': ('valuable_drops_summary', 'Value'),
+    'PvP Kills': ('pvp_kills_summary', 'Count'),
+    'PvP Kills Value': ('pvp_kills_summary', 'Value'),
+    'PvP Deaths': ('pvp_deaths_summary', 'Count'),
+    'PvP Deaths Value': ('pvp_deaths_summary', 'Value'),
+    'Times Kicked': ('kicked_by_player_summary', 'Count'),
+    'Kicks Given': ('kicker_summary', 'Count'),
+    'Whips Stolen': ('stolen_whips_summary', 'Count'),
+    'Whips Value': ('stolen_whips_summary', 'Value'),
+    "'111' Messages": ('menaces_111_summary', 'Count'),
+    "'gz' Messages": ('big_gzers_summary', 'Count'),
+    "'cya hick' Messages": ('cya_hick_crew_summary', 'Count'),
+}
+# The tables whose rows are listed on a player's profile.
+PROFILE_DETAIL_TABLES = {
+    'drops': 'valuable_drops_detail_all_time',
+    'kills': 'pvp_kills_detail_all_time',
+    'deaths': 'pvp_deaths_detail_all_time',
+    'personal_bests': 'personal_bests_summary',
+    'achievements': 'recent_achievements',
+}
+
+# The stats of every player, for the summary table store entries they were aggregated from.
+_player_stats = {'generations': None, 'stats': None}
+_player_stats_lock = threading.Lock()
+_player_stats_builds = _SingleFlight()
+
+def _aggregate_player_stats(entries: dict) -> pd.DataFrame:
+    """
+    Aggregates the PROFILE_STATS columns of the summary tables into one frame, with a row
+    per player key and a (Stat, Period) column per stat and period. Zero if a player is
+    missing from a table.
+    """
+    columns = {}
+    for stat, (table_name, prefix) in PROFILE_STATS.items():
+        entry = entries.get(table_name)
+        name_column = PLAYER_TABLES[table_name]
+        if entry is None or name_column not in entry['frame'].columns:
+            continue
+        frame = entry['frame']
+        keys = frame[name_column].astype(str).map(_player_key).to_numpy()
+        for period in PERIOD_SUFFIXES:
+            column = f"{prefix}_{period}"
+            if column in frame.columns:
+                columns[(stat, period)] = pd.to_numeric(frame[column], errors='coerce').groupby(keys).sum()
+    if not columns:
+        return pd.DataFrame(columns=pd.MultiIndex.from_arrays([[], []], names=['Stat', 'Period']))
+    stats = pd.DataFrame(columns).fillna(0)
+    stats.columns = pd.MultiIndex.from_tuples(list(columns), names=['Stat', 'Period'])
+    return stats
+
+def _get_player_stats(entries: dict) -> pd.DataFrame:
+    """Returns the aggregated stats of every player, rebuilding them only when a summary table has been reloaded."""
+    generations = tuple((table_name, entry['generation']) for table_name, entry in entries.items())
+    with _player_stats_lock:
+        if _player_stats['generations'] == generations:
+            return _player_stats['stats']
+
+    def build():
+        stats = _aggregate_player_stats(entries)
+        with _player_stats_lock:
+            _player_stats.update(generations=generations, stats=stats)
+        return stats
+
+    stats, _ = _player_stats_builds.do(generations, build)
+    return stats
+
+def get_player_profile(username: str) -> Optional[dict]:
+    """
+    Returns everything the dashboard knows about one player, or None if they are in none of
+    the tables:
+    - 'name': the player's name as written in the tables.
+    - 'stats': a frame with a row per PROFILE_STATS stat and a column per period.
+    - 'drops', 'kills', 'deaths', 'personal_bests', 'achievements': the player's rows of the
+      PROFILE_DETAIL_TABLES.
+    Every player's stats are aggregated once per version of the summary tables and the rows
+    come from the player index, so building a profile only touches the player's own data.
+    """
+    summary_tables = list(dict.fromkeys(table_name for table_name, _ in PROFILE_STATS.values()))
+    indexes = _load_player_indexes(summary_tables + list(PROFILE_DETAIL_TABLES.values()))
+    key = _player_key(username)
+
+    name = next((index['names'][key] for _, index in indexes.values() if key in index['names']), None)
+    if name is None:
+        return None
+
+    stats = _get_player_stats({table_name: indexes[table_name][0] for table_name in summary_tables if table_name in indexes})
+    stat_names = [stat for stat in PROFILE_STATS if stat in stats.columns.get_level_values('Stat')]
+    if key in stats.index:
+        player_stats = stats.loc[key].unstack('Period').reindex(index=stat_names, columns=PERIOD_SUFFIXES, fill_value=0)
+    else:
+        player_stats = pd.DataFrame(0, index=stat_names, columns=PERIOD_SUFFIXES)
+
+    profile = {'name': name, 'stats': player_stats}
+    for section, table_name in PROFILE_DETAIL_TABLES.items():
+        if table_name not in indexes:
+            profile[section] = pd.DataFrame()
+            continue
+        entry, index = indexes[table_name]
+        positions = index['positions'].get(key)
+        profile[section] = entry['frame'].iloc[positions] if positions is not None else entry['frame'].iloc[0:0]
+    return profile
+
+# --- Leaderboards ---
+
+# Tables with a row per player and a Count_<period> (and some a Value_<period>) column per period.
+SUMMARY_TABLES = [
+    'valuable_drops_summary',
+    'pvp_kills_summary',
+    'pvp_deaths_summary',
+    'kicked_by_player_summary',
+    'kicker_summary',
+    'stolen_whips_summary',
+    'menaces_111_summary',
+    'big_gzers_summary',
+    'cya_hick_crew_summary',
+]
+
+# table_name -> {'generation', 'views'} for the store entry last ranked, see _rank_leaderboards.
+_leaderboards = {}
+_leaderboards_lock = threading.Lock()
+_leaderboard_builds = _SingleFlight()
+
+def _rank_leaderboards(frame: pd.DataFrame, name_column: str) -> dict:
+    """
+    Ranks a summary table for every period, by count and, if it has one, by value.
+    Returns {(period_suffix, 'Count' or 'Value'): leaderboard}, each leaderboard holding the
+    name, count and value columns of the players with a non-zero count in the period,
+    highest first with ties broken alphabetically by name.
+    """
+    if name_column not in frame.columns:
+        return {}
+    names = frame[name_column].astype(str).str.casefold().to_numpy()
+    views = {}
+    for period in PERIOD_SUFFIXES:
+        count_col, value_col = f"Count_{period}", f"Value_{period}"
+        if count_col not in frame.columns:
+            continue
+        columns = [name_column, count_col] + ([value_col] if value_col in frame.columns else [])
+        active = np.flatnonzero(frame[count_col].to_numpy(dtype='float64', na_value=np.nan) > 0)
+        for rank_col in columns[1:]:
+            rank_values = frame[rank_col].to_numpy(dtype='float64', na_value=np.nan)[active]
+            # lexsort sorts by its last key first: the ranking column descending, then the name.
+            order = active[np.lexsort((names[active], -rank_values))]
+            # Copy-on-write avoids copying the columns before selecting the rows, and again when resetting the index.
+            with pd.option_context("mode.copy_on_write", True):
+                views[(period, rank_col.split('_', 1)[0])] = frame[columns].iloc[order].reset_index(drop=True)
+    return views
+
+def _get_leaderboards(table_name: str, entry) -> dict:
+    """Returns the ranked leaderboards of a loaded summary table, ranking it once per store entry."""
+    generation = entry['generation']
+    with _leaderboards_lock:
+        cached = _leaderboards.get(table_name)
+        if cached is not None and cached['generation'] == generation:
+            return cached['views']
+
+    def build():
+        views = _rank_leaderboards(entry['frame'], PLAYER_TABLES[table_name])
+        with _leaderboards_lock:
+            _leaderboards[table_name] = {'generation': generation, 'views': views}
+        return views
+
+    views, _ = _leaderboard_builds.do((table_name, generation), build)
+    return views
+
+def load_leaderboard(table_name: str, period_suffix: str, rank_by: str = 'Count') -> pd.DataFrame:
+    """
+    Returns a summary table's leaderboard for one period: the name column, Count_<period> and,
+    if the table has one, Value_<period> of every player with a non-zero count in the period,
+    ranked by the <rank_by>_<period> column highest first and then by name.
+    Every period is ranked once per loaded copy of the table, so a rerun only looks up the ranked view.
+    The views are ranked from the full table as load_table(table_name) returns it, so a page can
+    check that table (e.g. whether the ETL has filled it) without an extra query.
+
+    Example:
+        df = load_leaderboard("valuable_drops_summary", "YTD", rank_by="Value")
+    """
+    if table_name not in SUMMARY_TABLES:
+        raise ValueError(f"'{table_name}' is not a summary table. Use one of {SUMMARY_TABLES}.")
+    entry = _load_entries({table_name: (table_name, build_table_query())})[table_name]
+    if entry is None:
         return pd.DataFrame()
+    view = _get_leaderboards(table_name, entry).get((period_suffix, rank_by))
+    # A shallow copy shares the ranked view, see load_tables.
+    return view.copy(deep=False) if view is not None else pd.DataFrame()
+
+# --- Date Range Queries ---
+
+# All-time detail tables that can be summarised over any date range, in the dashboard rather than the ETL.
+RANGE_TABLES = [
+    'valuable_drops_detail_all_time',
+    'pvp_kills_detail_all_time',
+    'pvp_deaths_detail_all_time',
+]
+# The sidebar option and the Count_/Value_ column suffix used for a custom date range.
+DATE_RANGE_LABEL = "Custom Date Range"
+DATE_RANGE_SUFFIX = 'Date_Range'
+DATE_RANGE_DEFAULT_DAYS = 30
+
+# table_name -> {'generation', 'index'} for the store entry last indexed, see _build_range_index.
+_range_indexes = {}
+_range_indexes_lock = threading.Lock()
+_range_index_builds = _SingleFlight()
+
+def _build_range_index(frame: pd.DataFrame) -> dict:
+    """
+    Indexes a detail table for date range queries. Rows are ranked by Timestamp, then sorted by
+    player and rank, with a running total of Item_Value alongside. A player's rows in a range are
+    then one contiguous run, found with two binary searches, and its count and value are
+    differences of the run's ends. Rows without a Timestamp or Username are left out.
+    """
+    timestamps = frame['Timestamp'].to_numpy(dtype='datetime64[ns]')
+    usable = np.flatnonzero(~np.isnat(timestamps) & frame['Username'].notna().to_numpy())
+    by_time = usable[np.argsort(timestamps[usable], kind='stable')]
+    codes, names = pd.factorize(frame['Username'].to_numpy(dtype=object)[by_time])
+
+    # Each row's key is (player, time rank), packed into one sortable integer.
+    n_rows = len(by_time)
+    keys = codes.astype('int64') * max(n_rows, 1) + np.arange(n_rows)
+    by_player = np.argsort(keys, kind='stable')
+    values = pd.to_numeric(frame['Item_Value'], errors='coerce').fillna(0).to_numpy()[by_time[by_player]]
+    return {
+        'rows_by_time': by_time,
+        'times': timestamps[by_time],
+        'names': names,
+        'sort_names': pd.Series(names, dtype=object).astype(str).str.casefold().to_numpy(),
+        'keys': keys[by_player],
+        'cumulative_values': np.concatenate([[0], np.cumsum(values)]),
+        'cumulative_by_time': np.concatenate([[0], np.cumsum(values[np.argsort(by_player)])]),
+    }
+
+def _get_range_index(table_name: str, entry) -> dict:
+    """
+    Returns the range index of a loaded all-time detail table, building it once per store entry.
+    The index holds row positions into the entry's frame, so it is never shared with another frame.
+    """
+    generation = entry['generation']
+    with _range_indexes_lock:
+        cached = _range_indexes.get(table_name)
+        if cached is not None and cached['generation'] == generation:
+            return cached['index']
+
+    def build():
+        frame = entry['frame']
+        if not {'Timestamp', 'Username', 'Item_Value'} <= set(frame.columns):
+            # An empty index, so every range is empty rather than an error.
+            frame = pd.DataFrame(columns=['Timestamp', 'Username', 'Item_Value'])
+        index = _build_range_index(frame)
+        with _range_indexes_lock:
+            _range_indexes[table_name] = {'generation': generation, 'index': index}
+        return index
+
+    index, _ = _range_index_builds.do((table_name, generation), build)
+    return index
+
+def _load_range_index(table_name: str):
+    """Loads an all-time detail table in full and returns (entry, range index), or (None, None) if it failed."""
+    if table_name not in RANGE_TABLES:
+        raise ValueError(f"'{table_name}' does not support date ranges. Use one of {RANGE_TABLES}.")
+    entry = _load_entries({table_name: (table_name, build_table_query())})[table_name]
+    if entry is None:
+        return None, None
+    return entry, _get_range_index(table_name, entry)
+
+def date_range_picker(key: str):
+    """
+    Shows a sidebar date range picker ending at the last ETL run, starting DATE_RANGE_DEFAULT_DAYS
+    before it. Returns (start_date, end_date), or None until both ends are picked.
+    """
+    latest = (get_last_updated_timestamp() or datetime.now(timezone.utc)).date()
+    picked = st.sidebar.date_input(
+        "Choose a date range (UTC):",
+        value=(latest - timedelta(days=DATE_RANGE_DEFAULT_DAYS - 1), latest),
+        max_value=latest,
+        key=key
+    )
+    if not isinstance(picked, (tuple, list)) or len(picked) != 2:
+        return None
+    return picked[0], picked[1]
+
+def _range_bounds(index: dict, start_date, end_date):
+    """Returns the time ranks [first, stop) of the rows dated from start_date to end_date inclusive, UTC."""
+    start = _to_utc_datetime64(pd.Timestamp(start_date).normalize())
+    end = _to_utc_datetime64(pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1))
+    first, stop = np.searchsorted(index['times'], [start, end], side='left')
+    return int(first), int(stop)
+
+def load_range_leaderboard(table_name: str, start_date, end_date, rank_by: str = 'Value') -> pd.DataFrame:
+    """
+    Returns a leaderboard for any range of dates (inclusive, UTC) worked out from an all-time
+    detail table: Username, Count_Date_Range and Value_Date_Range of every player with a row
+    in the range, ranked by the <rank_by> column highest first and then by name.
+    The table is indexed once per version, so a query is two binary searches per player.
+
+    Example:
+        df = load_range_leaderboard("valuable_drops_detail_all_time", date(2025, 1, 1), date(2025, 12, 31))
+    """
+    count_col, value_col = f"Count_{DATE_RANGE_SUFFIX}", f"Value_{DATE_RANGE_SUFFIX}"
+    entry, index = _load_range_index(table_name)
+    if index is None:
+        return pd.DataFrame(columns=['Username', count_col, value_col])
+    first, stop = _range_bounds(index, start_date, end_date)
+
+    keys, n_rows = index['keys'], max(len(index['times']), 1)
+    player_keys = np.arange(len(index['names']), dtype='int64') * n_rows
+    lows = np.searchsorted(keys, player_keys + first, side='left')
+    highs = np.searchsorted(keys, player_keys + stop, side='left')
+    counts = highs - lows
+    values = index['cumulative_values'][highs] - index['cumulative_values'][lows]
+
+    active = np.flatnonzero(counts > 0)
+    rank_values = (counts if rank_by == 'Count' else values)[active]
+    # lexsort sorts by its last key first: the ranking column descending, then the name.
+    order = active[np.lexsort((index['sort_names'][active], -rank_values))]
+    return pd.DataFrame({'Username': index['names'][order], count_col: counts[order], value_col: values[order]})
+
+def load_range_rows(table_name: str, start_date, end_date) -> pd.DataFrame:
+    """Returns the rows of an all-time detail table dated from start_date to end_date inclusive (UTC), newest first."""
+    entry, index = _load_range_index(table_name)
+    if index is None:
+        return pd.DataFrame()
+    first, stop = _range_bounds(index, start_date, end_date)
+    return entry['frame'].iloc[index['rows_by_time'][first:stop][::-1]]
+
+def get_chart_data_for_range(table_name: str, start_date, end_date) -> pd.DataFrame:
+    """
+    Returns the cumulative Item_Value of an all-time detail table over a range of dates
+    (inclusive, UTC), as a frame with 'Date' and 'Value' columns starting from zero.
+    Long ranges are downsampled like the period charts.
+    """
+    entry, index = _load_range_index(table_name)
+    if index is None:
+        return pd.DataFrame()
+    first, stop = _range_bounds(index, start_date, end_date)
+    cumulative = index['cumulative_by_time']
+    chart_dates = np.concatenate([[_to_utc_datetime64(pd.Timestamp(start_date))], index['times'][first:stop]])
+    chart_values = np.concatenate([[0], cumulative[first + 1:stop + 1] - cumulative[first]])
+    keep = _downsample_positions(chart_values, CHART_MAX_POINTS)
+    return pd.DataFrame({'Date': pd.DatetimeIndex(chart_dates[keep]).tz_localize('UTC'), 'Value': chart_values[keep]})
+
+# --- Top-K Selection ---
+
+def top_k(df: pd.DataFrame, column: str, k: int, name_column: str = 'Username') -> pd.DataFrame:
+    """
+    Returns the k rows with the largest values in a column, largest first, with ties broken
+    alphabetically by name_column (then by row order), without sorting the whole frame.
+    np.partition finds the k-th largest value in linear time and only the rows at or above
+    it are sorted. Rows with a missing value are never picked.
+    """
+    if k <= 0 or df.empty:
+        return df.iloc[0:0]
+    values = df[column].to_numpy(dtype='float64', na_value=np.nan)
+    candidates = np.flatnonzero(~np.isnan(values))
+    if len(candidates) > k:
+        kth_largest = np.partition(values[candidates], len(candidates) - k)[len(candidates) - k]
+        # Keeps every row tied with the k-th largest value, so the tie-break decides between them.
+        candidates = candidates[values[candidates] >= kth_largest]
+    if name_column in df.columns:
+        names = np.array([str(name).casefold() for name in df[name_column].to_numpy()[candidates]])
+    else:
+        names = np.zeros(len(candidates))
+    # lexsort sorts by its last key first and is stable, so full ties keep their row order.
+    order = candidates[np.lexsort((names, -values[candidates]))][:k]
+    return df.iloc[order]
+
+# The most MVPs a section's slider can be set to show.
+MVP_MAX_COUNT = 10
+
+def mvp_count_slider(label: str, default_count: int, key: str) -> int:
+    """Shows a sidebar slider for how many MVPs one section of a page lists, starting at that section's configured count."""
+    return st.sidebar.slider(
+        label,
+        min_value=1,
+        max_value=max(MVP_MAX_COUNT, default_count),
+        value=default_count,
+        key=key
+    )
+
+# --- Shared Assets ---
+
+DASHBOARD_DIR = Path(__file__).resolve().parent
+ASSETS_DIR = DASHBOARD_DIR / "pages" / "assets"
+PAGE_BACKGROUNDS_DIR = ASSETS_DIR / "Page_backgrounds"
+ITEM_DATA_PATH = ASSETS_DIR / "items-complete.json"
+BINGO_CONFIG_PATH = DASHBOARD_DIR / "pages" / "bingo_board.yml"
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_dashboard_texts() -> dict:
+    """Loads the text snippets shared by all pages from dashboard_texts.toml. Raises if it can't be read."""
+    return toml.load(DASHBOARD_DIR / 'dashboard_texts.toml')
+
+@st.cache_resource(show_spinner=False)
+def load_item_maps(path) -> tuple:
+    """
+    Loads item data from the osrsreboxed items-complete.json file, creating two mappings:
+    1. A mapping from lowercase item name to its base64 icon data URI.
+    2. A mapping from lowercase item name to its wiki URL.
+    Items where 'noted' is false take priority. Raises if the file can't be read.
+    The maps are shared read-only by every session rather than copied per rerun.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    # Use an intermediate dictionary to handle noted/un-noted priority.
+    processed_items = {}
+    for item_id, item_details in data.items():
+        name = item_details.get('name')
+        if not name:
+            continue
+
+        name_lower = name.lower()
+        is_noted = item_details.get('noted', True)
+
+        # We want to store the item if it's the first one we've seen with this name,
+        # or if it's the un-noted version, which takes priority.
+        if name_lower not in processed_items or not is_noted:
+            processed_items[name_lower] = {
+                'icon': item_details.get('icon'),
+                'wiki_url': item_details.get('wiki_url')
+            }
+
+    # Create the final maps from the processed data.
+    name_to_icon_map = {
+        name: f"data:image/png;base64,{details['icon']}"
+        for name, details in processed_items.items()
+        if details.get('icon')
+    }
+    name_to_wiki_url_map = {
+        name: details['wiki_url']
+        for name, details in processed_items.items()
+        if details.get('wiki_url')
+    }
+
+    return name_to_icon_map, name_to_wiki_url_map
+
+@st.cache_resource(show_spinner=False)
+def get_image_as_base64(file_path):
+    """Reads a local image file and returns its base64 encoded string, or None if it can't be read."""
+    try:
+        file_path = Path(file_path)
+        if not file_path.is_file():
+            return None
+        with open(file_path, "rb") as f:
+            data = f.read()
+        return base64.b64encode(data).decode() if data else None
+    except Exception:
+        return None
+
+# --- Server Warmup ---
+
+# Tables every visitor's first page load reads in full, warmed before anyone asks for them.
+# Per-period detail tables are listed once per period.
+WARMUP_TABLES = [
+    "run_metadata",
+    "valuable_drops_timeseries",
+    "pvp_kills_timeseries",
+    "pvp_deaths_timeseries",
+    "collection_log_summary",
+    "personal_bests_summary",
+    "recent_achievements",
+] + SUMMARY_TABLES + [
+    f"{prefix}_{suffix}"
+    for prefix in ["valuable_drops_detail", "pvp_kills_detail", "pvp_deaths_detail"]
+    for suffix in ["custom_days", "prev_week", "prev_month", "ytd", "all_time"]
+]
+
+_warmup_status = {
+    'version': None,
+    'ready': False,
+    'started_at': None,
+    'duration_seconds': None,
+    'tables_loaded': 0,
+    'tables_failed': 0,
+}
+_warmup_lock = threading.Lock()
+
+def _warm_assets():
+    """Loads the texts, item icon maps and background images the pages use into their shared caches."""
+    try:
+        load_dashboard_texts()
+    except Exception as e:
+        logger.warning("Warmup could not load dashboard_texts.toml: %s", e)
+    if ITEM_DATA_PATH.exists():
+        try:
+            load_item_maps(str(ITEM_DATA_PATH))
+        except Exception as e:
+            logger.warning("Warmup could not load item data: %s", e)
+    if PAGE_BACKGROUNDS_DIR.is_dir():
+        for image_path in PAGE_BACKGROUNDS_DIR.glob("*.png"):
+            get_image_as_base64(image_path)
+    try:
+        with open(BINGO_CONFIG_PATH, 'r') as f:
+            bingo_config = yaml.safe_load(f) or {}
+        background_image = bingo_config.get("board_settings", {}).get("background_image", "bingo_board_placeholder.png")
+        get_image_as_base64(BINGO_CONFIG_PATH.parent / background_image)
+    except Exception as e:
+        logger.warning("Warmup could not load the bingo board background: %s", e)
+
+def _run_warmup(db_version, conn, requests):
+    """Loads the given table queries into the shared table store, then the page assets."""
+    started = time.perf_counter()
+    store = get_table_store()
+    loaded = failed = 0
+    for table_name, query in requests:
+        try:
+            entry = store.get_current(table_name, query, db_version, conn)
+            if query == build_table_query():
+                # Player lookups, leaderboards and date ranges read the full tables, so index and rank them before anyone asks.
+                if table_name in PLAYER_TABLES:
+                    _get_player_positions(table_name, entry)
+                if table_name in SUMMARY_TABLES:
+                    _get_leaderboards(table_name, entry)
+                if table_name in RANGE_TABLES:
+                    _get_range_index(table_name, entry)
+            loaded += 1
+        except Exception as e:
+            failed += 1
+            logger.warning("Warmup of '%s' failed: %s", table_name, e)
+    _warm_assets()
+
+    duration = time.perf_counter() - started
+    with _warmup_lock:
+        # A newer database version may have started its own warmup in the meantime.
+        if _warmup_status['version'] == db_version:
+            _warmup_status.update(ready=True, duration_seconds=duration, tables_loaded=loaded, tables_failed=failed)
+    logger.info(
+        "Warmup for database version %s finished in %.1fs (%d tables loaded, %d failed).",
+        db_version, duration, loaded, failed,
+    )
+
+def _start_warmup(db_version, conn):
+    """Starts a background warmup the first time a database version is seen."""
+    with _warmup_lock:
+        if _warmup_status['version'] == db_version:
+            return
+        _warmup_status.update(
+            version=db_version, ready=False, started_at=datetime.now(timezone.utc),
+            duration_seconds=None, tables_loaded=0, tables_failed=0
+        )
+
+    # Besides the fixed list, re-warm every query shape visitors have already asked for,
+    # so the projected and filtered leaderboard queries are ready after an ETL swap too.
+    requests = [(table_name, build_table_query()) for table_name in WARMUP_TABLES]
+    requests += [key for key in get_table_store().queries() if key not in requests]
+    threading.Thread(
+        target=_run_warmup, args=(db_version, conn, requests),
+        name="dashboard-warmup", daemon=True
+    ).start()
+
+def start_warmup():
+    """
+    Warms every dashboard table and asset for the current database version in the background.
+    Runs automatically on the first table load after the server starts and after each
+    database version change; calling it again for the same version does nothing.
+    """
+    conn = init_connection()
+    if conn is not None:
+        _start_warmup(get_db_version(), conn)
+
+def get_warmup_status() -> dict:
+    """Returns the state of the latest warmup: its database version, readiness, start time, duration and table counts."""
+    with _warmup_lock:
+        return dict(_warmup_status)
+
+def is_warmup_complete() -> bool:
+    """True once every table and asset has been warmed for the current database version."""
+    status = get_warmup_status()
+    return status['ready'] and status['version'] == get_db_version()
+
+# --- Scoped Refresh ---
+
+# A session can ask for a refresh at most once per this many seconds.
+REFRESH_SESSION_COOLDOWN_SECONDS = float(os.environ.get("REFRESH_SESSION_COOLDOWN_SECONDS", 30))
+# However many sessions ask, the database version is re-checked at most once per this many seconds.
+REFRESH_GLOBAL_COOLDOWN_SECONDS = float(os.environ.get("REFRESH_GLOBAL_COOLDOWN_SECONDS", 10))
+
+_refresh_lock = threading.Lock()
+_last_version_check = 0.0
+
+def _recheck_db_version():
+    """Forgets the cached database version so the next get_db_version() reads it fresh."""
+    data_source = os.environ.get("DATA_SOURCE", "Online (Production)")
+    if data_source == 'Online (Production)':
+        _get_remote_db_version.clear()
+        return
+    watcher = _get_db_watcher()
+    if watcher is not None:
+        watcher._publish()
+    else:
+        _poll_local_db_state.clear()
+
+def refresh_data() -> str:
+    """
+    Checks for newly published data and reloads only the tables that changed, returning a
+    status message for the user. Unlike clearing Streamlit's caches, this leaves every other
+    session's data in place:
+    - Each session is rate limited to one request per REFRESH_SESSION_COOLDOWN_SECONDS.
+    - Requests from all sessions are coalesced: the version is re-checked at most once per
+      REFRESH_GLOBAL_COOLDOWN_SECONDS, and concurrent requests wait for that one check.
+    - A new version is reloaded by the background warmup, which runs once per version and only
+      reloads tables whose fingerprint changed. Spamming refresh never costs more than that.
+    """
+    global _last_version_check
+    now = time.monotonic()
+    last_request = st.session_state.get('_last_refresh_request')
+    if last_request is not None and now - last_request < REFRESH_SESSION_COOLDOWN_SECONDS:
+        return f"Data was refreshed moments ago. Try again in {REFRESH_SESSION_COOLDOWN_SECONDS - (now - last_request):.0f}s."
+    st.session_state['_last_refresh_request'] = now
+
+    previous_version = get_db_version()
+    with _refresh_lock:
+        if time.monotonic() - _last_version_check >= REFRESH_GLOBAL_COOLDOWN_SECONDS:
+            _recheck_db_version()
+            _last_version_check = time.monotonic()
+
+    conn = init_connection()
+    if conn is None:
+        return "Database connection is not available."
+    db_version = get_db_version()
+    _start_warmup(db_version, conn)
+    if db_version == previous_version:
+        return "Data is already up to date."
+    return "New data found. Changed tables are being reloaded."
 
-@st.cache_data(ttl=300)
 def get_last_updated_timestamp() -> datetime:
-    """Fetches the last ETL run timestamp from the metadata table."""
+    """
+    Fetches the last ETL run timestamp from the metadata table.
+    Not cached separately: the table comes from the shared table store, which is
+    refreshed as soon as the ETL publishes a new database version.
+    """
     df_meta = load_table('run_metadata')
     if not df_meta.empty and 'last_updated_utc' in df_meta.columns:
         # Handle potential empty dataframe after an ETL run before data is populated
@@ -139,10 +2203,11 @@ def get_last_updated_timestamp() -> datetime:
             return pd.to_datetime(df_meta['last_updated_utc'].iloc[0], utc=True)
     return None
 
-@st.cache_data(ttl=300)
 def load_dashboard_config() -> dict:
     """
     Loads the dashboard configuration table.
+    Like get_last_updated_timestamp, this reads from the shared table store and is
+    always current for the latest database version.
     """
     df = load_table('dashboard_config')
     if df.empty:
@@ -176,26 +2241,21 @@ def format_gp(value):
         return "0 gp"
     return f"{int(value):,} gp"
 
-def get_chart_data_for_period(df_timeseries, selected_period_label, dashboard_config, period_options_map, run_time, value_to_chart='Value'):
+def _period_window(period_suffix, custom_days: int, week_start_day: str, run_time):
     """
-    Filters the timeseries data for the selected period and prepares it for charting.
-    Can chart 'Value' or 'Count'.
+    Returns the (start, end, frequency) of a period's chart: the timeseries points of that
+    frequency dated start <= Date < end. Start and end are None for All-Time.
     """
-    period_suffix = period_options_map.get(selected_period_label)
-    cumulative_col = 'Cumulative_Value' if value_to_chart == 'Value' else 'Cumulative_Count'
-
     start_date, end_date, target_freq = None, None, None
 
     if period_suffix == 'Custom_Days':
-        custom_days = int(dashboard_config.get('custom_lookback_days', 14))
         target_freq = '6H' if custom_days <=14 else 'D'
         start_date = (run_time - timedelta(days=custom_days)).replace(hour=0, minute=0, second=0, microsecond=0)
         end_date = run_time
     elif period_suffix == 'Prev_Week':
         target_freq = 'D'
-        week_start_day_name = dashboard_config.get('week_start_day', 'Monday')
         weekday_map = {'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3, 'Friday': 4, 'Saturday': 5, 'Sunday': 6}
-        week_start_day_num = weekday_map.get(week_start_day_name, 0)
+        week_start_day_num = weekday_map.get(week_start_day, 0)
         
         days_since_week_start = (run_time.weekday() - week_start_day_num + 7) % 7
         start_of_current_week = (run_time - timedelta(days=days_since_week_start)).replace(hour=0, minute=0, second=0, microsecond=0)
@@ -209,36 +2269,111 @@ def get_chart_data_for_period(df_timeseries, selected_period_label, dashboard_co
         target_freq = 'W'
         start_date = run_time.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
         end_date = run_time
-    else: # All-Time
+    elif period_suffix == 'All_Time':
         target_freq = 'W'
 
+    return start_date, end_date, target_freq
+
+def _to_utc_datetime64(value) -> np.datetime64:
+    """Converts a datetime to a naive UTC numpy datetime64[ns], treating naive values as UTC."""
+    timestamp = pd.Timestamp(value)
+    timestamp = timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+    return timestamp.tz_localize(None).to_datetime64()
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _prepare_timeseries(table_name: str, generation, _df_timeseries: pd.DataFrame) -> dict:
+    """
+    Splits a timeseries table by frequency once per store entry (generation), with Date parsed and sorted.
+    Returns {frequency: {'Date': sorted naive UTC datetime64 array, 'Cumulative_Value': array,
+    'Cumulative_Count': array}}.
+    """
+    dates = _parse_timestamps(_df_timeseries['Date']).to_numpy(dtype='datetime64[ns]')
+    prepared = {}
+    for freq, positions in _df_timeseries.groupby('Frequency', observed=True, sort=False).indices.items():
+        positions = positions[~np.isnat(dates[positions])]
+        order = positions[np.argsort(dates[positions], kind='stable')]
+        prepared[freq] = {
+            'Date': dates[order],
+            **{
+                column: _df_timeseries[column].to_numpy()[order]
+                for column in ['Cumulative_Value', 'Cumulative_Count'] if column in _df_timeseries.columns
+            },
+        }
+    return prepared
+
+# Charts with more points than this are downsampled before being sent to the browser.
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", 500))
+
+def _downsample_positions(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Picks at most max_points positions of a series that keep its shape: the first and last
+    points, plus the lowest and highest point of each of the equal-width buckets in between.
+    Returns the sorted positions, or all of them if the series already fits.
+    """
+    n = len(values)
+    if max_points < 4 or n <= max_points:
+        return np.arange(n)
+    n_buckets = (max_points - 2) // 2
+    inner = values[1:-1]
+    buckets = np.arange(n - 2) * n_buckets // (n - 2)
+    bucket_starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    keep = [[0, n - 1]]
+    for reduce in (np.minimum, np.maximum):
+        # The first point of each bucket equal to the bucket's extreme.
+        is_extreme = inner == reduce.reduceat(inner, bucket_starts)[buckets]
+        hits = np.flatnonzero(is_extreme)
+        keep.append(hits[np.r_[True, buckets[hits][1:] != buckets[hits][:-1]]] + 1)
+    return np.unique(np.concatenate(keep))
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _chart_data(table_name: str, generation, period_suffix, run_time, value_to_chart: str, custom_days: int, week_start_day: str, _df_timeseries: pd.DataFrame) -> pd.DataFrame:
+    """Builds a period's chart from the prepared timeseries. Cached per store entry, period, run time and series."""
+    start_date, end_date, target_freq = _period_window(period_suffix, custom_days, week_start_day, run_time)
     if not target_freq: return pd.DataFrame()
 
-    df_filtered_by_freq = df_timeseries[df_timeseries['Frequency'] == target_freq].copy()
-    if df_filtered_by_freq.empty:
+    series = _prepare_timeseries(table_name, generation, _df_timeseries).get(target_freq)
+    cumulative_col = 'Cumulative_Value' if value_to_chart == 'Value' else 'Cumulative_Count'
+    if series is None or cumulative_col not in series:
         return pd.DataFrame()
-
-    df_filtered_by_freq['Date'] = pd.to_datetime(df_filtered_by_freq['Date'], utc=True)
-    df_filtered_by_freq.sort_values('Date', inplace=True)
+    dates, cumulative = series['Date'], series[cumulative_col]
 
     if period_suffix == 'All_Time':
-        df_all_time = df_filtered_by_freq.copy()
-        df_all_time['Value'] = df_all_time[cumulative_col]
-        
-        if not df_all_time.empty:
-            first_date = df_all_time.iloc[0]['Date']
-            zero_date = first_date - timedelta(days=7)
-            zero_row = pd.DataFrame([{'Date': zero_date, 'Value': 0}])
-            return pd.concat([zero_row, df_all_time[['Date', 'Value']]], ignore_index=True)
-        return df_all_time
-
-    df_before_period = df_filtered_by_freq[df_filtered_by_freq['Date'] < start_date]
-    start_value = df_before_period.iloc[-1][cumulative_col] if not df_before_period.empty else 0
-    
-    df_in_period = df_filtered_by_freq[(df_filtered_by_freq['Date'] >= start_date) & (df_filtered_by_freq['Date'] < end_date)].copy()
-    
-    df_in_period['Value'] = df_in_period[cumulative_col] - start_value
-    
-    zero_row = pd.DataFrame([{'Date': start_date, 'Value': 0}])
-    
-    return pd.concat([zero_row, df_in_period[['Date', 'Value']]], ignore_index=True)
+        # The chart starts from zero a week before the first point.
+        chart_dates = np.concatenate([[dates[0] - np.timedelta64(7, 'D')], dates])
+        chart_values = np.concatenate([[0], cumulative])
+    else:
+        # Two binary searches find the period's points: start <= Date < end.
+        start, end = _to_utc_datetime64(start_date), _to_utc_datetime64(end_date)
+        first, stop = np.searchsorted(dates, [start, end], side='left')
+        # The period is charted from zero, relative to the last cumulative value before it.
+        start_value = cumulative[first - 1] if first > 0 else 0
+        chart_dates = np.concatenate([[start], dates[first:stop]])
+        chart_values = np.concatenate([[0], cumulative[first:stop] - start_value])
+
+    # Downsampling always keeps the last point, so the period's final total stays exact.
+    keep = _downsample_positions(chart_values, CHART_MAX_POINTS)
+    chart_dates, chart_values = chart_dates[keep], chart_values[keep]
+
+    return pd.DataFrame({'Date': pd.DatetimeIndex(chart_dates).tz_localize('UTC'), 'Value': chart_values})
+
+def get_chart_data_for_period(table_name, selected_period_label, dashboard_config, period_options_map, run_time, value_to_chart='Value'):
+    """
+    Returns the cumulative chart of a timeseries table for the selected period, as a frame
+    with 'Date' and 'Value' columns starting from zero. Can chart 'Value' or 'Count'.
+    The table is split by frequency and sorted once per loaded copy, and each period's
+    chart is cached, so a rerun only looks it up. Charts longer than CHART_MAX_POINTS are
+    downsampled, keeping each bucket's low and high points and the final value.
+    """
+    entry = _load_entries({table_name: (table_name, build_table_query())})[table_name]
+    if entry is None or entry['frame'].empty or 'Date' not in entry['frame'].columns:
+        return pd.DataFrame()
+    return _chart_data(
+        table_name,
+        entry['generation'],
+        period_options_map.get(selected_period_label),
+        run_time,
+        value_to_chart,
+        int(dashboard_config.get('custom_lookback_days', 14)),
+        dashboard_config.get('week_start_day', 'Monday'),
+        entry['frame']
+    )
@@ -0,0 +1,49 @@
+"""
+Times _parse_timestamps against plain pd.to_datetime on the Timestamp shapes each backend returns.
+Run from the repository root: python bench/bench_parse_timestamps.py [rows]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from Streamlit_utils import _parse_timestamps
+
+
+def baseline(values):
+    if values.dtype == object:
+        return pd.to_datetime(values, format='mixed', errors='coerce', utc=True)
+    return pd.to_datetime(values, unit='s', utc=True)
+
+
+def timed(function, values):
+    started = time.perf_counter()
+    result = function(values)
+    return result, time.perf_counter() - started
+
+
+def main(rows: int):
+    rng = np.random.default_rng(0)
+    timestamps = (
+        pd.Timestamp('2024-01-01', tz='UTC')
+        + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, rows), unit='s')
+        + pd.to_timedelta(rng.integers(0, 10**6, rows), unit='us')
+    )
+    cases = {
+        'SQLite naive strings': pd.Series(timestamps.tz_localize(None).strftime('%Y-%m-%d %H:%M:%S.%f'), dtype=object),
+        'Supabase +00:00 strings': pd.Series(timestamps.strftime('%Y-%m-%dT%H:%M:%S.%f+00:00'), dtype=object),
+        'Epoch seconds': pd.Series(timestamps.astype('int64') // 10**9),
+    }
+    print(f"{rows:,} rows")
+    for name, values in cases.items():
+        expected, baseline_seconds = timed(baseline, values)
+        parsed, parsed_seconds = timed(_parse_timestamps, values)
+        same = parsed.equals(expected.astype('datetime64[ns, UTC]'))
+        print(f"{name:25s} pd.to_datetime {baseline_seconds:6.2f}s  _parse_timestamps {parsed_seconds:6.2f}s  same={same}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
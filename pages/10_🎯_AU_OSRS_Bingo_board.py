@@ -3,8 +3,8 @@
 
 import streamlit as st
 import yaml
+import Streamlit_utils
 from pathlib import Path
-import base64
 from PIL import Image
 import html
 import time
@@ -44,9 +44,9 @@ def load_background_image(file_path):
         with Image.open(path) as img:
             width, height = img.size
 
-        with open(path, "rb") as f:
-            b64_string = base64.b64encode(f.read()).decode()
-            
+        # The encoding is shared with the server warmup, so it is usually already done.
+        b64_string = Streamlit_utils.get_image_as_base64(path)
+
         return b64_string, width, height
     except Exception as e:
         st.error(f"Error reading background image: {e}")
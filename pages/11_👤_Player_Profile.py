@@ -0,0 +1,132 @@
+# dashboard/pages/11_👤_Player_Profile.py
+
+import streamlit as st
+import pandas as pd
+import Streamlit_utils
+
+st.set_page_config(page_title="Player Profile", page_icon="👤", layout="wide")
+
+# --- Helper Functions ---
+
+def display_detail_rows(title, df_rows, empty_message, column_config, column_order, sort_by=None, limit=10):
+    """Displays the first few of a player's rows from one table, optionally sorted."""
+    st.subheader(title)
+    if df_rows.empty:
+        st.info(empty_message)
+        return
+    if sort_by is not None:
+        df_rows = df_rows.sort_values(sort_by, ascending=False)
+    st.dataframe(
+        df_rows.head(limit),
+        column_config=column_config,
+        column_order=column_order,
+        use_container_width=True,
+        hide_index=True
+    )
+
+# --- Main Page Execution ---
+st.title("👤 Player Profile")
+st.markdown("Everything the clan has on one player: drops, PvP, kicks, whips, chat, PBs and achievements.")
+
+dashboard_config = Streamlit_utils.load_dashboard_config()
+all_players = Streamlit_utils.get_player_names()
+
+if not all_players:
+    st.warning("No player data could be loaded. The ETL pipeline may not have run yet.")
+else:
+    # Allows linking straight to a profile, e.g. ?player=Zezima
+    if "profile_player" not in st.session_state:
+        linked_player = st.query_params.get("player", "")
+        st.session_state.profile_player = linked_player if linked_player in all_players else ""
+    selected_player = st.selectbox("Search for a player:", options=[""] + all_players, key="profile_player")
+
+    if not selected_player:
+        st.info("Pick a player to see their profile.")
+    else:
+        st.query_params["player"] = selected_player
+        profile = Streamlit_utils.get_player_profile(selected_player)
+
+        if profile is None:
+            st.warning(f"No data found for **{selected_player}**.")
+        else:
+            st.header(profile['name'])
+            df_stats = profile['stats']
+            all_time = df_stats['All_Time'] if 'All_Time' in df_stats.columns else pd.Series(dtype='float64')
+
+            col1, col2, col3, col4, col5 = st.columns(5)
+            col1.metric("All-Time Drops Value", Streamlit_utils.format_gp(all_time.get('Drops Value', 0)))
+            col2.metric("All-Time PvP Kills", f"{int(all_time.get('PvP Kills', 0)):,}")
+            col3.metric("All-Time PvP Deaths", f"{int(all_time.get('PvP Deaths', 0)):,}")
+            col4.metric("PB Records Held", len(profile['personal_bests']))
+            col5.metric("Recent Achievements", len(profile['achievements']))
+            st.markdown("---")
+
+            # --- Per-period stats ---
+            st.subheader("Stats by Time Period")
+            period_options_map = Streamlit_utils.get_time_period_options(dashboard_config)
+            suffix_to_label_map = {v: k for k, v in period_options_map.items()}
+            df_period_stats = df_stats.rename(columns=suffix_to_label_map).astype('int64')
+            st.dataframe(df_period_stats, use_container_width=True)
+            st.markdown("---")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                display_detail_rows(
+                    "💰 Most Valuable Drops (All-Time)",
+                    profile['drops'],
+                    "No valuable drops recorded.",
+                    {
+                        "Timestamp": st.column_config.DatetimeColumn("Date", format="D MMM YYYY"),
+                        "Item_Name": "Item",
+                        "Item_Value": st.column_config.NumberColumn("Value", format="%,d")
+                    },
+                    ("Timestamp", "Item_Name", "Item_Value"),
+                    sort_by='Item_Value'
+                )
+                display_detail_rows(
+                    "⏱️ Personal Best Records Held",
+                    profile['personal_bests'],
+                    "No personal best records held.",
+                    {"Group": "Category", "Task": "Task", "Holder": "Holder(s)", "Time": "Time"},
+                    ("Group", "Task", "Holder", "Time")
+                )
+            with col2:
+                display_detail_rows(
+                    "⚔️ Latest PvP Kills (All-Time)",
+                    profile['kills'],
+                    "No PvP kills recorded.",
+                    {
+                        "Timestamp": st.column_config.DatetimeColumn("Date", format="D MMM YYYY"),
+                        "Opponent": "Victim",
+                        "Item_Value": st.column_config.NumberColumn("Loot Value", format="%,d")
+                    },
+                    ("Timestamp", "Opponent", "Item_Value"),
+                    sort_by='Timestamp'
+                )
+                display_detail_rows(
+                    "💀 Latest PvP Deaths (All-Time)",
+                    profile['deaths'],
+                    "No PvP deaths recorded. Safe... for now.",
+                    {
+                        "Timestamp": st.column_config.DatetimeColumn("Date", format="D MMM YYYY"),
+                        "Opponent": "Killer",
+                        "Item_Value": st.column_config.NumberColumn("Value Lost", format="%,d")
+                    },
+                    ("Timestamp", "Opponent", "Item_Value"),
+                    sort_by='Timestamp'
+                )
+
+            st.markdown("---")
+            display_detail_rows(
+                "🏆 Recent Achievements",
+                profile['achievements'],
+                "No recent achievements.",
+                {
+                    "Timestamp": st.column_config.DatetimeColumn("Date", format="D MMM YYYY"),
+                    "Broadcast_Type": "Type",
+                    "Content": "Achievement"
+                },
+                ("Timestamp", "Broadcast_Type", "Content"),
+                sort_by='Timestamp',
+                limit=25
+            )
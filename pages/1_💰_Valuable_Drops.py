@@ -5,12 +5,8 @@ import streamlit as st
 import pandas as pd
 import Streamlit_utils
 import random
-import toml
-from pathlib import Path
 from datetime import datetime, timedelta, timezone
 
-current_script_directory = Path(__file__).resolve().parent
-
 st.set_page_config(page_title="Valuable Drops", page_icon="💰", layout="wide")
 
 # --- Helper functions for this page ---
@@ -19,30 +15,23 @@ st.set_page_config(page_title="Valuable Drops", page_icon="💰", layout="wide")
 def load_texts():
     """Loads text snippets from the TOML file."""
     try:
-        texts_path = current_script_directory.parent / 'dashboard_texts.toml'
-        return toml.load(texts_path)
-    except FileNotFoundError:
-        st.error(f"Error: `dashboard_texts.toml` not found at expected path '{texts_path}'. Please ensure the file exists in the project root directory.")
-        return {}
+        return Streamlit_utils.load_dashboard_texts()
     except Exception as e:
-        st.error(f"Failed to load or parse dashboard_texts.toml: {e}")
+        st.error(f"Failed to load dashboard_texts.toml: {e}")
         return {}
 
-def display_mvp_section(df_leaderboard, df_period_detail, texts, value_col):
+def display_mvp_section(df_leaderboard, df_period_detail, texts, value_col, top_earners_count, biggest_drops_count):
     """Displays the MVP section for top earners and biggest single drops."""
     st.header("🏆 Period MVPs")
     
     page_texts = texts.get('valuable_drops', {})
-    
-    top_earners_count = page_texts.get('top_earners_count', 1)
-    biggest_drops_count = page_texts.get('biggest_drops_count', 1)
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader(f"Top Earner{'s' if top_earners_count > 1 else ''}")
-        if not df_leaderboard.empty and value_col in df_leaderboard.columns:
-            top_earners = df_leaderboard.sort_values(by=value_col, ascending=False).head(top_earners_count)
+        if not df_leaderboard.empty:
+            top_earners = Streamlit_utils.top_k(df_leaderboard, value_col, top_earners_count)
             
             messages = page_texts.get('top_earner_messages', [])
             random.shuffle(messages)
@@ -62,7 +51,7 @@ def display_mvp_section(df_leaderboard, df_period_detail, texts, value_col):
     with col2:
         st.subheader(f"Biggest Drop{'s' if biggest_drops_count > 1 else ''}")
         if not df_period_detail.empty:
-            biggest_drops = df_period_detail.sort_values(by='Item_Value', ascending=False).head(biggest_drops_count)
+            biggest_drops = Streamlit_utils.top_k(df_period_detail, 'Item_Value', biggest_drops_count)
 
             messages = page_texts.get('biggest_drop_messages', [])
             random.shuffle(messages)
@@ -89,12 +78,17 @@ st.markdown("This page shows leaderboards and trends for valuable drops received
 
 texts = load_texts()
 dashboard_config = Streamlit_utils.load_dashboard_config()
-df_leaderboard_summary = Streamlit_utils.load_table("valuable_drops_summary")
-df_timeseries = Streamlit_utils.load_table("valuable_drops_timeseries")
-df_meta = Streamlit_utils.load_table("run_metadata")
+frames = Streamlit_utils.load_tables({
+    "summary": "valuable_drops_summary",
+    "timeseries": "valuable_drops_timeseries",
+    "meta": "run_metadata",
+})
+df_summary = frames["summary"]
+df_timeseries = frames["timeseries"]
+df_meta = frames["meta"]
 run_time = pd.to_datetime(df_meta['last_updated_utc'].iloc[0], utc=True) if not df_meta.empty else datetime.now(timezone.utc)
 
-if df_leaderboard_summary.empty:
+if df_summary.empty:
     st.warning("No valuable drop data could be loaded. The ETL pipeline may not have run yet.")
 else:
     period_options_map = Streamlit_utils.get_time_period_options(dashboard_config)
@@ -103,6 +97,7 @@ else:
     ordered_suffixes = ['Custom_Days', 'Prev_Week', 'Prev_Month', 'YTD', 'All_Time']
     suffix_to_label_map = {v: k for k, v in period_options_map.items()}
     ordered_labels = [suffix_to_label_map[suffix] for suffix in ordered_suffixes if suffix in suffix_to_label_map]
+    ordered_labels.append(Streamlit_utils.DATE_RANGE_LABEL)
 
     selected_period_label = st.sidebar.radio(
         "Choose a time period:", 
@@ -111,7 +106,25 @@ else:
         horizontal=False,
     )
     
-    period_suffix = period_options_map.get(selected_period_label)
+    date_range = None
+    if selected_period_label == Streamlit_utils.DATE_RANGE_LABEL:
+        period_suffix = Streamlit_utils.DATE_RANGE_SUFFIX
+        date_range = Streamlit_utils.date_range_picker(key="drops_date_range")
+        if date_range is None:
+            st.info("Pick a start and an end date in the sidebar.")
+            st.stop()
+        selected_period_label = f"{date_range[0]:%d %b %Y} to {date_range[1]:%d %b %Y}"
+    else:
+        period_suffix = period_options_map.get(selected_period_label)
+
+    drops_texts = texts.get('valuable_drops', {})
+    st.sidebar.markdown("### Number of MVPs")
+    top_earners_count = Streamlit_utils.mvp_count_slider(
+        "Top Earners:", drops_texts.get('top_earners_count', 1), key="drops_top_earners_count"
+    )
+    biggest_drops_count = Streamlit_utils.mvp_count_slider(
+        "Biggest Drops:", drops_texts.get('biggest_drops_count', 1), key="drops_biggest_drops_count"
+    )
     
     if not period_suffix:
         st.error("Could not determine the selected time period. Please try again.")
@@ -122,15 +135,19 @@ else:
     value_col = f'Value_{period_suffix}'
     count_col = f'Count_{period_suffix}'
     
-    if count_col in df_leaderboard_summary.columns:
-        df_period_leaderboard = df_leaderboard_summary[df_leaderboard_summary[count_col] > 0].copy()
+    if date_range:
+        # Any date range is worked out from the all-time drops, indexed once per data version.
+        df_period_leaderboard = Streamlit_utils.load_range_leaderboard("valuable_drops_detail_all_time", *date_range, rank_by='Value')
+        df_period_detail = Streamlit_utils.load_range_rows("valuable_drops_detail_all_time", *date_range)
     else:
-        df_period_leaderboard = pd.DataFrame()
-
-    df_period_detail = Streamlit_utils.load_table(f"valuable_drops_detail_{period_suffix.lower()}")
+        # The players with drops in this period, top earners first, ranked once per data version.
+        df_period_leaderboard = Streamlit_utils.load_leaderboard("valuable_drops_summary", period_suffix, rank_by='Value')
+        df_period_detail = Streamlit_utils.load_table(f"valuable_drops_detail_{period_suffix.lower()}")
+        # Warm the other periods' detail tables so switching periods doesn't wait on the database.
+        Streamlit_utils.prefetch_period_tables("valuable_drops_detail_{}", period_suffix)
     
     if not df_period_detail.empty or not df_period_leaderboard.empty:
-        display_mvp_section(df_period_leaderboard, df_period_detail, texts, value_col)
+        display_mvp_section(df_period_leaderboard, df_period_detail, texts, value_col, top_earners_count, biggest_drops_count)
 
     st.subheader("Leaderboards & Details")
     col1, col2 = st.columns([1, 2])
@@ -138,15 +155,14 @@ else:
     with col1:
         st.metric(label="Top Earners by Total Value", value="")
         if not df_period_leaderboard.empty:
-            top_earners = df_period_leaderboard.sort_values(by=value_col, ascending=False)[['Username', value_col, count_col]]
-            
             st.dataframe(
-                top_earners, 
+                df_period_leaderboard, 
                 column_config={
                     "Username": "Player",
                     value_col: st.column_config.NumberColumn("Total GP Value", format="%d"),
                     count_col: "Drops"
                 },
+                column_order=("Username", value_col, count_col),
                 use_container_width=True, 
                 hide_index=True
             )
@@ -155,9 +171,9 @@ else:
             
     with col2:
         top_drops_limit = int(dashboard_config.get('top_drops_limit', 50))
-        if period_suffix in ['YTD', 'All_Time']:
+        if period_suffix in ['YTD', 'All_Time', Streamlit_utils.DATE_RANGE_SUFFIX]:
             title = f"Top {top_drops_limit} Most Valuable Drops"
-            display_df = df_period_detail.sort_values(by='Item_Value', ascending=False).head(top_drops_limit)
+            display_df = Streamlit_utils.top_k(df_period_detail, 'Item_Value', top_drops_limit)
         else:
             title = "All Drops This Period"
             display_df = df_period_detail
@@ -187,7 +203,10 @@ else:
     if df_timeseries.empty:
         st.info("No timeseries data available to plot.")
     else:
-        chart_data = Streamlit_utils.get_chart_data_for_period(df_timeseries, selected_period_label, dashboard_config, period_options_map, run_time)
+        if date_range:
+            chart_data = Streamlit_utils.get_chart_data_for_range("valuable_drops_detail_all_time", *date_range)
+        else:
+            chart_data = Streamlit_utils.get_chart_data_for_period("valuable_drops_timeseries", selected_period_label, dashboard_config, period_options_map, run_time)
         
         if not chart_data.empty:
             total_gp_in_period = chart_data['Value'].max()
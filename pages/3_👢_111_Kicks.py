@@ -4,11 +4,7 @@ import streamlit as st
 import pandas as pd
 import Streamlit_utils
 import random
-import toml
 from datetime import datetime, timezone
-from pathlib import Path
-
-current_script_directory = Path(__file__).resolve().parent
 
 st.set_page_config(page_title="111 Kicks", page_icon="👢", layout="wide")
 
@@ -18,7 +14,7 @@ st.set_page_config(page_title="111 Kicks", page_icon="👢", layout="wide")
 def load_texts():
     """Loads text snippets from the TOML file."""
     try:
-        return toml.load(current_script_directory.parent / 'dashboard_texts.toml')
+        return Streamlit_utils.load_dashboard_texts()
     except Exception as e:
         st.error(f"Failed to load dashboard_texts.toml: {e}")
         return {}
@@ -27,16 +23,8 @@ def display_mvp(title, df_summary, messages, count, player_col, count_col):
     """Generic function to display an MVP section for kicks."""
     st.subheader(title)
     
-    if df_summary.empty or count_col not in df_summary.columns:
-        st.info(f"No data available for this section.")
-        return
-
-    df_filtered = df_summary[df_summary[count_col] > 0]
-    if df_filtered.empty:
-        st.info(f"No qualifying players for this section.")
-        return
-
-    mvps = df_filtered.sort_values(by=count_col, ascending=False).head(count)
+    # The summary is already filtered to this period's non-zero rows.
+    mvps = Streamlit_utils.top_k(df_summary, count_col, count, name_column=player_col)
     if mvps.empty:
         st.info(f"No qualifying players for this section.")
         return
@@ -57,10 +45,12 @@ st.markdown("Who's getting the boot? This page tracks players who have been temp
 
 texts = load_texts()
 dashboard_config = Streamlit_utils.load_dashboard_config()
-df_kicked = Streamlit_utils.load_table("kicked_by_player_summary")
-df_kickers = Streamlit_utils.load_table("kicker_summary")
+kick_frames = Streamlit_utils.load_tables({
+    "kicked": "kicked_by_player_summary",
+    "kickers": "kicker_summary",
+})
 
-if df_kicked.empty and df_kickers.empty:
+if kick_frames["kicked"].empty and kick_frames["kickers"].empty:
     st.warning("No kick data could be loaded. The ETL pipeline may not have run yet.")
 else:
     period_options_map = Streamlit_utils.get_time_period_options(dashboard_config)
@@ -78,6 +68,20 @@ else:
     )
     
     period_suffix = period_options_map.get(selected_period_label)
+    count_col = f'Count_{period_suffix}'
+
+    kicks_texts = texts.get('kicks', {})
+    st.sidebar.markdown("### Number of MVPs")
+    top_kicked_count = Streamlit_utils.mvp_count_slider(
+        "Most Kicked:", kicks_texts.get('top_kicked_count', 1), key="kicks_top_kicked_count"
+    )
+    fastest_finger_count = Streamlit_utils.mvp_count_slider(
+        "Most Trigger-Happy Admins:", kicks_texts.get('fastest_finger_count', 1), key="kicks_fastest_finger_count"
+    )
+
+    # Only the players who were actually involved in this period, most kicks first.
+    df_kicked = Streamlit_utils.load_leaderboard("kicked_by_player_summary", period_suffix)
+    df_kickers = Streamlit_utils.load_leaderboard("kicker_summary", period_suffix)
     
     st.header(f"Displaying Report for: {selected_period_label}")
     st.markdown("---")
@@ -93,33 +97,27 @@ else:
             "Most Kicked",
             df_kicked,
             page_texts.get('top_kicked_messages', []),
-            page_texts.get('top_kicked_count', 1),
+            top_kicked_count,
             'Username',
-            f'Count_{period_suffix}'
+            count_col
         )
         st.markdown("---")
         
         # Kicked Leaderboard
         st.subheader("Leaderboard")
-        count_col_kicked = f'Count_{period_suffix}'
-        if not df_kicked.empty and count_col_kicked in df_kicked.columns:
-            df_kicked_period = df_kicked[df_kicked[count_col_kicked] > 0]
-            if not df_kicked_period.empty:
-                df_display = df_kicked_period.sort_values(by=count_col_kicked, ascending=False)
-                st.dataframe(
-                    df_display,
-                    column_config={
-                        "Username": "Player",
-                        count_col_kicked: "Times Kicked"
-                    },
-                    column_order=("Username", count_col_kicked),
-                    use_container_width=True,
-                    hide_index=True
-                )
-            else:
-                st.info("No one was kicked in this period.")
+        if not df_kicked.empty:
+            st.dataframe(
+                df_kicked,
+                column_config={
+                    "Username": "Player",
+                    count_col: "Times Kicked"
+                },
+                column_order=("Username", count_col),
+                use_container_width=True,
+                hide_index=True
+            )
         else:
-            st.info("No kick data available.")
+            st.info("No one was kicked in this period.")
 
     with col2:
         st.header("The Kickers")
@@ -130,30 +128,24 @@ else:
             "Most Trigger-Happy Admin",
             df_kickers,
             page_texts.get('fastest_finger_messages', []),
-            page_texts.get('fastest_finger_count', 1),
+            fastest_finger_count,
             'Action_By',
-            f'Count_{period_suffix}'
+            count_col
         )
         st.markdown("---")
         
         # Kicker Leaderboard
         st.subheader("Leaderboard")
-        count_col_kickers = f'Count_{period_suffix}'
-        if not df_kickers.empty and count_col_kickers in df_kickers.columns:
-            df_kickers_period = df_kickers[df_kickers[count_col_kickers] > 0]
-            if not df_kickers_period.empty:
-                df_display = df_kickers_period.sort_values(by=count_col_kickers, ascending=False)
-                st.dataframe(
-                    df_display,
-                    column_config={
-                        "Action_By": "Admin",
-                        count_col_kickers: "Players Kicked"
-                    },
-                    column_order=("Action_By", count_col_kickers),
-                    use_container_width=True,
-                    hide_index=True
-                )
-            else:
-                st.info("No admins kicked anyone this period.")
+        if not df_kickers.empty:
+            st.dataframe(
+                df_kickers,
+                column_config={
+                    "Action_By": "Admin",
+                    count_col: "Players Kicked"
+                },
+                column_order=("Action_By", count_col),
+                use_container_width=True,
+                hide_index=True
+            )
         else:
-            st.info("No kicker data available.")
+            st.info("No admins kicked anyone this period.")
@@ -4,11 +4,7 @@ import streamlit as st
 import pandas as pd
 import Streamlit_utils
 import random
-import toml
 from datetime import datetime, timezone
-from pathlib import Path
-
-current_script_directory = Path(__file__).resolve().parent
 
 st.set_page_config(page_title="Stolen Whips", page_icon="🐍", layout="wide")
 
@@ -18,7 +14,7 @@ st.set_page_config(page_title="Stolen Whips", page_icon="🐍", layout="wide")
 def load_texts():
     """Loads text snippets from the TOML file."""
     try:
-        return toml.load(current_script_directory.parent / 'dashboard_texts.toml')
+        return Streamlit_utils.load_dashboard_texts()
     except Exception as e:
         st.error(f"Failed to load dashboard_texts.toml: {e}")
         return {}
@@ -59,19 +55,20 @@ else:
 
     st.header(f"State of the Whips for: {selected_period_label}")
 
-    if count_col in df_whips.columns:
-        df_period = df_whips[df_whips[count_col] > 0].copy()
-        
+    # Only the players who actually have whips in this period, most whips first.
+    df_period = Streamlit_utils.load_leaderboard("stolen_whips_summary", period_suffix)
+
+    # An empty frame without columns means the period is missing from the table or the load failed.
+    if {'Username', count_col} <= set(df_period.columns):
         queen_stats = df_period[df_period['Username'] == whip_queen]
         queen_count = int(queen_stats[count_col].sum()) if not queen_stats.empty else 0
 
         thieves_df = df_period[df_period['Username'] != whip_queen]
-        total_stolen = int(thieves_df[count_col].sum())
+        total_stolen = int(thieves_df[count_col].sum()) if not thieves_df.empty else 0
         
         top_thief = "nobody"
         if not thieves_df.empty:
-            top_thief_series = thieves_df.sort_values(by=count_col, ascending=False)
-            top_thief = top_thief_series.iloc[0]['Username']
+            top_thief = thieves_df.iloc[0]['Username']
 
         # Display Shame Message
         shame_messages = page_texts.get('whip_shame_messages', [])
@@ -89,9 +86,8 @@ else:
         if thieves_df.empty:
             st.success("No whips have been stolen in this period. All is right with the world.")
         else:
-            thieves_display = thieves_df.sort_values(by=count_col, ascending=False)
             st.dataframe(
-                thieves_display,
+                thieves_df,
                 column_config={
                     "Username": "Thief",
                     count_col: "Whips Stolen",
@@ -102,4 +98,4 @@ else:
                 hide_index=True
             )
     else:
-        st.info("No whip data available for this period.")
\ No newline at end of file
+        st.info("No whip data available for this period.")
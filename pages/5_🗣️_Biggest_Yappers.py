@@ -4,10 +4,6 @@ import streamlit as st
 import pandas as pd
 import Streamlit_utils
 import random
-import toml
-from pathlib import Path
-
-current_script_directory = Path(__file__).resolve().parent
 
 st.set_page_config(page_title="Biggest Yappers", page_icon="🗣️", layout="wide")
 
@@ -17,7 +13,7 @@ st.set_page_config(page_title="Biggest Yappers", page_icon="🗣️", layout="wi
 def load_texts():
     """Loads text snippets from the TOML file."""
     try:
-        return toml.load(current_script_directory.parent / 'dashboard_texts.toml')
+        return Streamlit_utils.load_dashboard_texts()
     except Exception as e:
         st.error(f"Failed to load dashboard_texts.toml: {e}")
         return {}
@@ -27,19 +23,14 @@ def display_yapper_leaderboard(df, period_suffix, title, messages, icon, mvp_cou
     st.header(title)
     
     count_col = f'Count_{period_suffix}'
-    if df.empty or count_col not in df.columns:
-        st.info(f"Nobody was yapping about this in the selected period.")
-        return
-
-    df_period = df[df[count_col] > 0].copy()
-    
-    if df_period.empty:
+    # df holds only this period's non-zero rows, already ranked.
+    if df.empty:
         st.info(f"Nobody was yapping about this in the selected period.")
         return
 
     # MVP Section
     st.subheader("Period MVP")
-    top_yappers = df_period.sort_values(by=count_col, ascending=False).head(mvp_count)
+    top_yappers = Streamlit_utils.top_k(df, count_col, mvp_count)
     
     random.shuffle(messages)
     for i, row in enumerate(top_yappers.itertuples()):
@@ -52,9 +43,8 @@ def display_yapper_leaderboard(df, period_suffix, title, messages, icon, mvp_cou
     
     # Leaderboard Table
     st.subheader("Leaderboard")
-    leaderboard = df_period.sort_values(by=count_col, ascending=False)
     st.dataframe(
-        leaderboard,
+        df,
         column_config={
             "Username": "Player",
             count_col: "Count"
@@ -71,12 +61,13 @@ st.markdown("Who's the chattiest in the clan? This page tracks who's saying the
 texts = load_texts()
 dashboard_config = Streamlit_utils.load_dashboard_config()
 
-# Load data for all yapper categories
-df_menaces = Streamlit_utils.load_table("menaces_111_summary")
-df_gzers = Streamlit_utils.load_table("big_gzers_summary")
-df_cya_hick = Streamlit_utils.load_table("cya_hick_crew_summary")
+yapper_tables = ["menaces_111_summary", "big_gzers_summary", "cya_hick_crew_summary"]
+yapper_frames = Streamlit_utils.load_tables(yapper_tables)
+has_menaces = not yapper_frames["menaces_111_summary"].empty
+has_gzers = not yapper_frames["big_gzers_summary"].empty
+has_cya_hick = not yapper_frames["cya_hick_crew_summary"].empty
 
-if df_menaces.empty and df_gzers.empty and df_cya_hick.empty:
+if not (has_menaces or has_gzers or has_cya_hick):
     st.warning("No chat count data could be loaded. The ETL pipeline may not have run yet.")
 else:
     period_options_map = Streamlit_utils.get_time_period_options(dashboard_config)
@@ -94,38 +85,50 @@ else:
     )
     
     period_suffix = period_options_map.get(selected_period_label)
+
+    yapper_texts = texts.get('yappers', {})
+    st.sidebar.markdown("### Number of MVPs")
+    top_yapper_count = Streamlit_utils.mvp_count_slider(
+        "The Menaces (111):", yapper_texts.get('top_yapper_count', 1), key="yappers_top_yapper_count"
+    )
+    top_gzer_count = Streamlit_utils.mvp_count_slider(
+        "The GZers (gz):", yapper_texts.get('top_gzer_count', 1), key="yappers_top_gzer_count"
+    )
     
     st.header(f"Displaying Report for: {selected_period_label}")
     st.markdown("---")
     
     page_texts = texts.get('yappers', {})
+    yappers = {
+        table_name: Streamlit_utils.load_leaderboard(table_name, period_suffix) for table_name in yapper_tables
+    }
 
     col1, col2 = st.columns(2)
     with col1:
-        if not df_menaces.empty:
+        if has_menaces:
             display_yapper_leaderboard(
-                df_menaces, 
+                yappers["menaces_111_summary"], 
                 period_suffix, 
                 "The Menaces (111)", 
                 page_texts.get('top_yapper_messages', []), 
                 "🗣️",
-                page_texts.get('top_yapper_count', 1)
+                top_yapper_count
             )
     with col2:
-        if not df_gzers.empty:
+        if has_gzers:
             display_yapper_leaderboard(
-                df_gzers, 
+                yappers["big_gzers_summary"], 
                 period_suffix, 
                 "The GZers (gz)", 
                 page_texts.get('top_gzer_messages', []), 
                 "🎉",
-                page_texts.get('top_gzer_count', 1)
+                top_gzer_count
             )
 
     st.markdown("---")
-    if not df_cya_hick.empty:
+    if has_cya_hick:
         display_yapper_leaderboard(
-            df_cya_hick, 
+            yappers["cya_hick_crew_summary"], 
             period_suffix, 
             "The 'cya hick' Crew", 
             ["**{player}** is the biggest hick, saying it {count} times."], 
@@ -6,7 +6,6 @@ import Streamlit_utils
 import json
 import html
 import os
-import base64
 import re
 
 st.set_page_config(page_title="Clan Collection Log", page_icon="📜", layout="wide")
@@ -17,65 +16,18 @@ st.set_page_config(page_title="Clan Collection Log", page_icon="📜", layout="w
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
 CUSTOM_ICON_DIR = os.path.join(ASSETS_DIR, "custom_icons")
 # Path to the local item data file that includes base64 icons
-ITEM_DATA_PATH = os.path.join(ASSETS_DIR, "items-complete.json")
+ITEM_DATA_PATH = str(Streamlit_utils.ITEM_DATA_PATH)
 
 # --- Helper function to load all item data from a single local file ---
-@st.cache_data
 def load_item_data(path):
     """
-    Loads item data from a local JSON file, creating two mappings:
-    1. A mapping from lowercase item name to its base64 icon data URI.
-    2. A mapping from lowercase item name to its wiki URL.
-    This function prioritizes items where 'noted' is false.
+    Returns the item icon and wiki URL maps from the local item data file.
+    The maps are built once per server by Streamlit_utils.load_item_maps and shared by every session.
     """
     if not os.path.exists(path):
         st.error(f"Fatal Error: The item data file was not found at {path}")
         return {}, {}
-    
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Use an intermediate dictionary to handle noted/un-noted priority.
-    processed_items = {}
-    for item_id, item_details in data.items():
-        name = item_details.get('name')
-        if not name:
-            continue
-        
-        name_lower = name.lower()
-        is_noted = item_details.get('noted', True)
-
-        # We want to store the item if it's the first one we've seen with this name,
-        # or if it's the un-noted version, which takes priority.
-        if name_lower not in processed_items or not is_noted:
-            processed_items[name_lower] = {
-                'icon': item_details.get('icon'),
-                'wiki_url': item_details.get('wiki_url')
-            }
-
-    # Create the final maps from the processed data.
-    name_to_icon_map = {
-        name: f"data:image/png;base64,{details['icon']}"
-        for name, details in processed_items.items()
-        if details.get('icon')
-    }
-    name_to_wiki_url_map = {
-        name: details['wiki_url']
-        for name, details in processed_items.items()
-        if details.get('wiki_url')
-    }
-    
-    return name_to_icon_map, name_to_wiki_url_map
-
-# --- Helper function to get image as base64 (for custom icons) ---
-@st.cache_data
-def get_image_as_base64(file_path):
-    """Reads a local image file and returns its base64 encoded string."""
-    if not os.path.exists(file_path):
-        return None
-    with open(file_path, "rb") as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+    return Streamlit_utils.load_item_maps(path)
 
 # --- Custom CSS for the responsive card grid layout ---
 st.markdown("""
@@ -254,7 +206,7 @@ else:
                     custom_icon_path = os.path.join(CUSTOM_ICON_DIR, custom_icon_filename)
                     
                     if os.path.exists(custom_icon_path):
-                        icon_b64 = get_image_as_base64(custom_icon_path)
+                        icon_b64 = Streamlit_utils.get_image_as_base64(custom_icon_path)
                         if icon_b64:
                             icon_src = f"data:image/webp;base64,{icon_b64}"
                     
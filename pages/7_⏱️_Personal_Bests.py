@@ -4,8 +4,6 @@ import streamlit as st
 import pandas as pd
 import random
 import Streamlit_utils
-import toml
-from pathlib import Path
 import json
 import html
 
@@ -18,9 +16,7 @@ st.set_page_config(page_title="Personal Bests", page_icon="⏱️", layout="wide
 def load_texts():
     """Loads text snippets from the TOML file."""
     try:
-        # Adjust the path to correctly locate dashboard_texts.toml in the parent directory
-        current_script_directory = Path(__file__).resolve().parent
-        return toml.load(current_script_directory.parent / 'dashboard_texts.toml')
+        return Streamlit_utils.load_dashboard_texts()
     except Exception as e:
         st.error(f"Failed to load dashboard_texts.toml: {e}")
         return {}
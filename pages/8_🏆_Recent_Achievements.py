@@ -4,20 +4,16 @@ import streamlit as st
 import pandas as pd
 import random
 import Streamlit_utils
-import toml
-from pathlib import Path
 import html
 import re
 
-current_script_directory = Path(__file__).resolve().parent
-
 st.set_page_config(page_title="Recent Achievements", page_icon="🏆", layout="wide")
 
 @st.cache_data(ttl=300)
 def load_texts():
     """Loads text snippets from the TOML file."""
     try:
-        return toml.load(current_script_directory.parent / 'dashboard_texts.toml')
+        return Streamlit_utils.load_dashboard_texts()
     except Exception as e:
         st.error(f"Failed to load dashboard_texts.toml: {e}")
         return {}
@@ -28,7 +24,7 @@ def get_achievement_message(row, texts):
     page_texts = texts.get('recent_achievements', {})
     
     player = html.escape(row.get('Username', 'Someone'))
-    date = pd.to_datetime(row.get('Timestamp')).strftime('%d %b %Y')
+    date = row.get('Timestamp').strftime('%d %b %Y')
     
     new_level_val = row.get('New_Level')
     level = int(new_level_val) if pd.notna(new_level_val) else 0
@@ -66,7 +62,7 @@ def display_achievement_card(row, texts, color_map):
     card_class = color_map.get(broadcast_type, 'card-default')
     
     message = get_achievement_message(row, texts)
-    date = pd.to_datetime(row.get('Timestamp')).strftime('%d %b %Y')
+    date = row.get('Timestamp').strftime('%d %b %Y')
     title = html.escape(broadcast_type)
 
     return (
@@ -136,7 +132,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-df_achievements = Streamlit_utils.load_table("recent_achievements")
+# Newest first: the sections below take the head of each type as its latest achievement.
+df_achievements = Streamlit_utils.load_table("recent_achievements", order_by="-Timestamp")
 texts = load_texts()
 
 if df_achievements.empty:
@@ -7,7 +7,6 @@ import Streamlit_utils
 import toml
 from pathlib import Path
 import html
-import base64
 
 # --- Page Configuration ---
 st.set_page_config(page_title="Hardcore Deaths", page_icon="☠️", layout="wide")
@@ -46,28 +45,6 @@ RANDOM_OFFSET_X_PX = 40         # Max horizontal offset.
 
 # --- Functions ---
 
-@st.cache_data
-def get_image_as_base64(file_path):
-    """Reads a local image file and returns its base64 encoded string."""
-    try:
-        file_path = Path(file_path)
-        if not file_path.exists():
-            return None
-            
-        if not file_path.is_file():
-            return None
-            
-        with open(file_path, "rb") as f:
-            data = f.read()
-            
-        if len(data) == 0:
-            return None
-            
-        return base64.b64encode(data).decode()
-        
-    except Exception as e:
-        return None
-
 def set_page_background(image_filename):
     """Sets the background of the page to the specified image."""
     if not image_filename:
@@ -92,7 +69,7 @@ def set_page_background(image_filename):
     if not image_path:
         return False
 
-    base64_image = get_image_as_base64(image_path)
+    base64_image = Streamlit_utils.get_image_as_base64(image_path)
     
     if base64_image:
         # Try multiple CSS selectors for better compatibility
@@ -225,7 +202,11 @@ st.markdown(f"""
 def load_texts():
     """Loads text snippets from the TOML file."""
     try:
-        # Try multiple paths for the TOML file too
+        return Streamlit_utils.load_dashboard_texts()
+    except Exception:
+        pass
+    try:
+        # Fall back to the other places the TOML file may live
         current_script_directory = Path(__file__).resolve().parent
         possible_toml_paths = [
             current_script_directory.parent / 'dashboard_texts.toml',
@@ -241,22 +222,26 @@ def load_texts():
     except Exception as e:
         return {}
 
-@st.cache_data(ttl=300)
 def load_hc_deaths():
-    """Loads and filters for Hardcore death events."""
+    """
+    Loads and filters for Hardcore death events.
+    Not cached here: the shared table store already keeps this query, and reloads it as soon as the ETL publishes new deaths.
+    """
     try:
-        df_achievements = Streamlit_utils.load_table("recent_achievements")
-        if df_achievements.empty:
+        # Let the database filter to HC deaths and sort them newest first.
+        df_deaths = Streamlit_utils.load_table(
+            "recent_achievements",
+            where=[('Broadcast_Type', 'eq', 'HC Life Lost')],
+            order_by='-Timestamp'
+        )
+        if df_deaths.empty:
             return pd.DataFrame()
         
-        df_deaths = df_achievements[df_achievements['Broadcast_Type'] == 'HC Life Lost'].copy()
-        
         if 'New_Group_Lives' not in df_deaths.columns:
             df_deaths['New_Group_Lives'] = None
         else:
             df_deaths['New_Group_Lives'] = df_deaths['New_Group_Lives'].replace({"": None, pd.NA: None})
 
-        df_deaths.sort_values(by='Timestamp', ascending=False, inplace=True)
         return df_deaths
     except Exception as e:
         return pd.DataFrame()
@@ -267,7 +252,7 @@ def get_death_details(row, texts):
     """Determines the death type and message from a row."""
     page_texts = texts.get('hardcore_deaths', {})
     player = row.get('Username', 'A brave warrior')
-    date = pd.to_datetime(row.get('Timestamp')).strftime('%d %b %Y')
+    date = row.get('Timestamp').strftime('%d %b %Y')
     group_lives = row.get('New_Group_Lives')
 
     base_class = "tombstone"
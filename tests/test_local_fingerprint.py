@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from Streamlit_utils import _fingerprint_local_table
+
+ROWS = {
+    'Timestamp': ['2024-01-01 00:00:00', '2024-01-02 00:00:00'],
+    'Username': ['Bob', 'Alice'],
+    'Item_Value': [100, 250],
+}
+
+
+def fingerprint(tmp_path, name, rows):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    pd.DataFrame(rows).to_sql('drops', engine, index=False)
+    try:
+        return _fingerprint_local_table('drops', engine)
+    finally:
+        engine.dispose()
+
+
+def test_same_content_gives_the_same_fingerprint(tmp_path):
+    assert fingerprint(tmp_path, 'a.db', ROWS) == fingerprint(tmp_path, 'b.db', ROWS)
+
+
+@pytest.mark.parametrize('column, values', [
+    ('Item_Value', [999, 250]),
+    ('Username', ['Bobby', 'Alice']),
+    ('Username', ['Rob', 'Alice']),
+])
+def test_rewritten_rows_change_the_fingerprint(tmp_path, column, values):
+    # The row count and latest Timestamp stay the same, as after an ETL run that re-values old drops.
+    changed = {**ROWS, column: values}
+    before, after = fingerprint(tmp_path, 'a.db', ROWS), fingerprint(tmp_path, 'b.db', changed)
+    assert before[:2] == after[:2]
+    assert before != after
+
+
+def test_tables_without_timestamp_are_not_fingerprinted(tmp_path):
+    assert fingerprint(tmp_path, 'a.db', {'Username': ['Bob'], 'Count_All_Time': [1]}) is None
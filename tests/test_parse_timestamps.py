@@ -0,0 +1,82 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Streamlit_utils import _parse_timestamps
+
+UTC_DTYPE = 'datetime64[ns, UTC]'
+
+
+def utc(*values):
+    return pd.Series([pd.Timestamp(value, tz='UTC') for value in values], dtype=UTC_DTYPE)
+
+
+def check(values, expected):
+    parsed = _parse_timestamps(values)
+    assert str(parsed.dtype) == UTC_DTYPE
+    assert parsed.index.equals(values.index)
+    pd.testing.assert_series_equal(parsed.reset_index(drop=True), expected, check_names=False)
+
+
+def test_naive_sqlite_strings_are_read_as_utc():
+    values = pd.Series(['2024-01-02 03:04:05.123456', '2024-06-30 23:59:59'], dtype=object)
+    check(values, utc('2024-01-02 03:04:05.123456', '2024-06-30 23:59:59'))
+
+
+@pytest.mark.parametrize('suffix', ['+00:00', 'Z'])
+def test_supabase_utc_strings(suffix):
+    values = pd.Series([f'2024-01-02T03:04:05.5{suffix}', f'2024-01-03T00:00:00{suffix}'], dtype=object)
+    check(values, utc('2024-01-02 03:04:05.5', '2024-01-03 00:00:00'))
+
+
+def test_non_utc_offsets_are_converted():
+    values = pd.Series(['2024-01-02T10:00:00+10:00', '2024-01-02T00:00:00-02:00'], dtype=object)
+    check(values, utc('2024-01-02 00:00:00', '2024-01-02 02:00:00'))
+
+
+@pytest.mark.parametrize('values, expected', [
+    (['2024-01-02 03:04:05', '2024-01-02T04:00:00+00:00', '2024-01-02T05:00:00Z'],
+     ['2024-01-02 03:04:05', '2024-01-02 04:00:00', '2024-01-02 05:00:00']),
+    (['2024-01-02T04:00:00+00:00', '2024-01-02 03:04:05', '2024-01-02T05:00:00Z'],
+     ['2024-01-02 04:00:00', '2024-01-02 03:04:05', '2024-01-02 05:00:00']),
+])
+def test_mixed_shapes_fall_back_to_per_value_parsing(values, expected):
+    check(pd.Series(values, dtype=object), utc(*expected))
+
+
+def test_missing_and_unparseable_strings_become_nat():
+    values = pd.Series([None, '2024-01-02 03:04:05', 'not a date'], dtype=object)
+    parsed = _parse_timestamps(values)
+    assert str(parsed.dtype) == UTC_DTYPE
+    assert parsed.isna().tolist() == [True, False, True]
+    assert parsed[1] == pd.Timestamp('2024-01-02 03:04:05', tz='UTC')
+
+
+def test_all_missing_strings():
+    parsed = _parse_timestamps(pd.Series([None, None], dtype=object))
+    assert str(parsed.dtype) == UTC_DTYPE
+    assert parsed.isna().all()
+
+
+def test_epoch_seconds_and_milliseconds():
+    check(pd.Series([1704164645, 1704164646]), utc('2024-01-02 03:04:05', '2024-01-02 03:04:06'))
+    check(pd.Series([1704164645123, 1704164646000]), utc('2024-01-02 03:04:05.123', '2024-01-02 03:04:06'))
+    check(pd.Series([1704164645.5, np.nan]), pd.Series([pd.Timestamp('2024-01-02 03:04:05.5', tz='UTC'), pd.NaT], dtype=UTC_DTYPE))
+
+
+def test_datetime_columns_are_localised_or_converted():
+    naive = pd.Series(pd.to_datetime(['2024-01-02 03:04:05']))
+    check(naive, utc('2024-01-02 03:04:05'))
+    brisbane = naive.dt.tz_localize('Australia/Brisbane')
+    check(brisbane, utc('2024-01-01 17:04:05'))
+    objects = pd.Series([dt.datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc)], dtype=object)
+    check(objects, utc('2024-01-02 03:04:05'))
+
+
+def test_index_and_name_are_kept():
+    values = pd.Series(['2024-01-02 03:04:05', '2024-01-03 03:04:05'], index=[7, 3], name='Timestamp', dtype=object)
+    parsed = _parse_timestamps(values)
+    assert parsed.index.tolist() == [7, 3]
+    assert parsed.name == 'Timestamp'
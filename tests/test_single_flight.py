@@ -0,0 +1,94 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import Streamlit_utils
+
+CALLERS = 32
+JOIN_TIMEOUT_SECONDS = 10
+
+
+class Backend:
+    """Stands in for _read_table. Every read blocks until all callers have asked for the table."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.reads = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def read(self, table_name, query, conn):
+        with self._lock:
+            self.reads += 1
+        assert self.release.wait(JOIN_TIMEOUT_SECONDS)
+        if self.error is not None:
+            raise self.error
+        return pd.DataFrame({'Username': ['a', 'b'], 'Value': [1, 2]})
+
+
+@pytest.fixture
+def store(monkeypatch):
+    # An unstable table version keeps the Arrow cache on disk out of the test.
+    monkeypatch.setattr(Streamlit_utils, '_get_table_fingerprint', lambda table_name, db_version, conn: ('file', None))
+    return Streamlit_utils._TableStore(64 * 1024 ** 2)
+
+
+def load_concurrently(store, backend, monkeypatch):
+    """Calls get_current from CALLERS threads at once and returns each caller's entry or exception."""
+    monkeypatch.setattr(Streamlit_utils, '_read_table', backend.read)
+    arrived = threading.Semaphore(0)
+    single_flight_do = store._loads.do
+
+    def counted_do(key, fn):
+        arrived.release()
+        return single_flight_do(key, fn)
+
+    monkeypatch.setattr(store._loads, 'do', counted_do)
+    query = Streamlit_utils.build_table_query()
+    results = [None] * CALLERS
+
+    def call(index):
+        try:
+            results[index] = store.get_current('cold_table', query, 1, conn=object())
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=call, args=(index,), daemon=True) for index in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    for _ in range(CALLERS):
+        assert arrived.acquire(timeout=JOIN_TIMEOUT_SECONDS)
+    backend.release.set()
+    for thread in threads:
+        thread.join(JOIN_TIMEOUT_SECONDS)
+    assert not any(thread.is_alive() for thread in threads), "a caller stalled"
+    return results
+
+
+@pytest.mark.parametrize('run', range(3))
+def test_cold_table_is_fetched_once_for_all_callers(store, monkeypatch, run):
+    backend = Backend()
+    results = load_concurrently(store, backend, monkeypatch)
+
+    assert backend.reads == 1
+    assert all(isinstance(entry, dict) for entry in results)
+    assert len({id(entry['frame']) for entry in results}) == 1
+    assert store.counters()['coalesced'] >= 1
+
+
+@pytest.mark.parametrize('run', range(3))
+def test_leader_failure_reaches_every_caller(store, monkeypatch, run):
+    error = RuntimeError("backend down")
+    backend = Backend(error)
+    results = load_concurrently(store, backend, monkeypatch)
+
+    assert all(result is error for result in results)
+
+    # The failure is not remembered, so the next call fetches the table again.
+    recovered = Backend()
+    recovered.release.set()
+    monkeypatch.setattr(Streamlit_utils, '_read_table', recovered.read)
+    entry = store.get_current('cold_table', Streamlit_utils.build_table_query(), 1, conn=object())
+    assert recovered.reads == 1
+    assert entry['frame']['Username'].tolist() == ['a', 'b']